@@ -9,6 +9,9 @@ import PyPDF2
 import asyncio
 
 from src.data_anonymization import MedicalTextAnonymizer
+from src.data_anonymization import PiranhaPIIModel, CamembertNERWithDatesModel
+from src.data_anonymization import get_model_registry
+from src.data_anonymization.server import RemoteAnonymizer
 from src.extraction import process_csv
 from src.structured_results import json_to_mesh_mapped_dataframe
 from src.extraction import run_async
@@ -16,6 +19,7 @@ from src.extraction import split_obser_extraction
 from src.extraction.convert_medical_history import convert_medical_history
 from src.extraction import ComorbidityICD10Converter
 from src.extraction import LifestyleExtractor
+from src.extraction import get_llm_cache
 
 
 # Ensure the project's `src` directory is on sys.path so imports resolve
@@ -57,17 +61,34 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+# When set, anonymization goes to a shared model server (python -m src.data_anonymization.server)
+# and this process loads no model
+ANONYMIZATION_SERVER_URL = os.environ.get("ANONYMIZATION_SERVER_URL")
+
+
+@st.cache_resource(show_spinner="Loading anonymization models...")
+def warm_up_anonymization_models():
+    """Load the NER models once per server process, reruns reuse the registry"""
+    registry = get_model_registry()
+    registry.warm_up(PiranhaPIIModel, CamembertNERWithDatesModel)
+    return registry
+
+
 # Placeholder functions for the NLP pipeline
 def anonymize_text(text):
     """
     TODO: Insert CamemBERT anonymization code here
     """
     # Anonymization using the MedicalTextAnonymizer pipeline
-    anonymizer = MedicalTextAnonymizer(
-        chunk_size=500,
-        chunk_overlap=100,
-        confidence_threshold=0.5
-    )
+    # Models come from the process-wide registry, so this does not reload weights
+    if ANONYMIZATION_SERVER_URL:
+        anonymizer = RemoteAnonymizer(ANONYMIZATION_SERVER_URL)
+    else:
+        anonymizer = MedicalTextAnonymizer(
+            chunk_size=500,
+            chunk_overlap=100,
+            confidence_threshold=0.5
+        )
     # Get anonymization results
     results = anonymizer.anonymize_text(text)
     
@@ -125,6 +146,7 @@ def create_comorbidities_ic10_df():
     df = converter.process_csv(
         input_file="src/extraction/extraction_dataset/comorbidities_output.csv",
         output_file="comorbidites_icd10.csv",
+        batch_size=10,
     )
     return df
 
@@ -220,6 +242,12 @@ elif step == "Anonymization":
     if st.session_state.raw_text is None:
         st.warning("Please upload text first.")
     else:
+        if ANONYMIZATION_SERVER_URL:
+            st.caption(f"Anonymization server: {ANONYMIZATION_SERVER_URL}")
+        else:
+            registry = warm_up_anonymization_models()
+            st.caption(f"Models in memory: {registry.memory_report()['total_memory_mb']} MB")
+
         output_display = "" # Results of the anonymization process to display
         if st.button("Run Anonymization"):
             with st.spinner("Anonymizing..."):
@@ -256,6 +284,14 @@ elif step == "Extraction":
                 end = time.time() # Time measurement end
 
             st.success(f"Extraction complete. {end - start:.2f} seconds taken.")
+            llm_calls_avoided = st.session_state.lifestyle_df.attrs.get("llm_calls_avoided")
+            if llm_calls_avoided is not None:
+                st.caption(f"Lifestyle rules: {llm_calls_avoided:.0%} of patients needed no LLM call")
+            cache_stats = get_llm_cache().stats()
+            st.caption(
+                f"LLM cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                f"({cache_stats['hit_rate']:.0%}), {cache_stats['saved_seconds']} s of API calls saved"
+            )
             
         if st.session_state.xml_output:
             with st.expander("Extraction Results (XML)"):
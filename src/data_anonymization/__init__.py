@@ -3,14 +3,27 @@
 from .orchestrator import MedicalTextAnonymizer
 from .core.entities import Entity, ChunkWithPosition
 from .core.enums import AnonymizationLevel
+from .core.offset_map import OffsetMap, ReplacementSpan
+from .core.entity_cache import EntityCache, get_entity_cache
+from .core.cascade import CascadePolicy
 from .models.piranha import PiranhaPIIModel
 from .models.camembert import CamembertNERWithDatesModel
+from .models.rules import RuleBasedPIIDetector
+from .models.registry import ModelRegistry, get_model_registry
 
 __all__ = [
     'MedicalTextAnonymizer',
     'Entity',
     'ChunkWithPosition',
     'AnonymizationLevel',
+    'OffsetMap',
+    'ReplacementSpan',
+    'EntityCache',
+    'get_entity_cache',
+    'CascadePolicy',
     'PiranhaPIIModel',
     'CamembertNERWithDatesModel',
+    'RuleBasedPIIDetector',
+    'ModelRegistry',
+    'get_model_registry',
 ]
@@ -0,0 +1,277 @@
+"""
+Headless batch anonymization of a corpus
+
+Reads a directory of .txt files, a CSV or a JSONL file, anonymizes the
+records on a pool of worker processes and writes JSONL or Parquet shards.
+A manifest in the output directory records finished shards, so a killed
+job started again with the same arguments resumes where it stopped.
+
+Run from the repository root:
+    python -m src.data_anonymization.batch_runner notes.csv out/ --text-column text --workers 4
+"""
+import argparse
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from .core.execution import _threads_per_worker
+from .orchestrator import MedicalTextAnonymizer
+from .utils import json_default, setup_logging
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMATS = ("jsonl", "parquet")
+MANIFEST_NAME = "manifest.json"
+
+# (record id, text)
+Record = Tuple[str, str]
+
+
+def iter_records(input_path: str, text_column: str = "text", id_column: str = "id") -> Iterator[Record]:
+    """Stream records from a directory of .txt files, a CSV or a JSONL file, in a stable order"""
+    if os.path.isdir(input_path):
+        for root, dirs, files in os.walk(input_path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith('.txt'):
+                    path = os.path.join(root, name)
+                    with open(path, encoding='utf-8') as f:
+                        yield os.path.relpath(path, input_path), f.read()
+        return
+
+    if input_path.endswith('.csv'):
+        # Clinical notes easily exceed the default 128 KB field limit
+        csv.field_size_limit(sys.maxsize)
+        with open(input_path, newline='', encoding='utf-8') as f:
+            for row_number, row in enumerate(csv.DictReader(f)):
+                yield str(row.get(id_column) or row_number), row.get(text_column) or ""
+        return
+
+    if input_path.endswith('.jsonl'):
+        with open(input_path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f):
+                if line.strip():
+                    record = json.loads(line)
+                    yield str(record.get(id_column, line_number)), record.get(text_column) or ""
+        return
+
+    raise ValueError(f"Unsupported input '{input_path}', expected a directory, a .csv or a .jsonl file")
+
+
+def _write_atomic(path: str, write) -> None:
+    """Write through a temporary file so a killed job never leaves a partial file"""
+    tmp_path = f"{path}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def write_shard(path: str, rows: List[Dict[str, Any]], output_format: str) -> None:
+    """Write anonymized rows as JSONL, or as Parquet with entities serialized to JSON"""
+    if output_format == "parquet":
+        import pandas as pd
+        frame = pd.DataFrame([{**row, 'entities': json.dumps(row['entities'], ensure_ascii=False, default=json_default)}
+                              for row in rows])
+        _write_atomic(path, lambda tmp: frame.to_parquet(tmp, index=False))
+        return
+
+    def write_jsonl(tmp_path: str) -> None:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False, default=json_default) + "\n")
+
+    _write_atomic(path, write_jsonl)
+
+
+class Manifest:
+    """Finished shards of a batch job, saved after every shard"""
+
+    def __init__(self, output_dir: str, job: Dict[str, Any]):
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.job = job
+        self.completed: Dict[str, Dict[str, Any]] = {}
+
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved['job'] != job:
+                raise ValueError(f"{self.path} belongs to another job ({saved['job']}), "
+                                 f"use a new output directory or the same arguments")
+            self.completed = saved['completed']
+            logger.info(f"Resuming: {len(self.completed)} shards already done")
+
+    def is_done(self, shard_index: int) -> bool:
+        return str(shard_index) in self.completed
+
+    def mark_done(self, shard_index: int, summary: Dict[str, Any]) -> None:
+        self.completed[str(shard_index)] = summary
+
+        def write(tmp_path: str) -> None:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'job': self.job, 'completed': self.completed}, f, indent=2)
+
+        _write_atomic(self.path, write)
+
+
+# Anonymizer of each worker process, built once by _init_worker
+_WORKER_ANONYMIZER: Optional[MedicalTextAnonymizer] = None
+
+
+def _init_worker(anonymizer_options: Dict[str, Any], torch_threads: int) -> None:
+    global _WORKER_ANONYMIZER
+    import torch
+    torch.set_num_threads(torch_threads)
+    _WORKER_ANONYMIZER = MedicalTextAnonymizer(execution_backend="serial", **anonymizer_options)
+
+
+def _anonymize_shard(shard_index: int, records: List[Record], path: str, output_format: str) -> Dict[str, Any]:
+    """Anonymize one shard of records and write it, returns the shard summary"""
+    rows = []
+    chars = 0
+    for record_id, text in records:
+        result = _WORKER_ANONYMIZER.anonymize_text(text)  # type: ignore
+        rows.append({
+            'id': record_id,
+            'anonymized_text': result['anonymized_text'],
+            'entities': result['entities']
+        })
+        chars += len(text)
+
+    write_shard(path, rows, output_format)
+    return {
+        'shard': shard_index,
+        'file': os.path.basename(path),
+        'docs': len(rows),
+        'chars': chars,
+        'entities': sum(len(row['entities']) for row in rows)
+    }
+
+
+def _shards(records: Iterator[Record], shard_size: int) -> Iterator[Tuple[int, List[Record]]]:
+    shard_index = 0
+    while True:
+        shard = list(islice(records, shard_size))
+        if not shard:
+            return
+        yield shard_index, shard
+        shard_index += 1
+
+
+def run_batch(input_path: str, output_dir: str, output_format: str = "jsonl", workers: int = 2,
+              shard_size: int = 500, text_column: str = "text", id_column: str = "id",
+              anonymizer_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Anonymize every record of the input into shards of shard_size records
+
+    Args:
+        workers: Worker processes, 1 runs everything in the calling process
+        anonymizer_options: Keyword arguments of MedicalTextAnonymizer, the
+            execution backend is always serial inside a worker
+
+    Returns:
+        Totals of the shards processed by this run
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{output_format}', expected one of {OUTPUT_FORMATS}")
+
+    anonymizer_options = anonymizer_options or {}
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = Manifest(output_dir, {
+        'input': os.path.abspath(input_path),
+        'format': output_format,
+        'shard_size': shard_size,
+        'text_column': text_column,
+        'id_column': id_column,
+        # Output of a resumed job must come from the same configuration, compared as saved JSON
+        'anonymizer_options': json.loads(json.dumps(anonymizer_options, sort_keys=True, default=repr))
+    })
+
+    totals = {'shards': 0, 'docs': 0, 'chars': 0, 'entities': 0, 'skipped_shards': 0}
+    start = time.perf_counter()
+
+    def record_done(summary: Dict[str, Any]) -> None:
+        manifest.mark_done(summary['shard'], summary)
+        for key in ('docs', 'chars', 'entities'):
+            totals[key] += summary[key]
+        totals['shards'] += 1
+        elapsed = time.perf_counter() - start
+        logger.info(f"Shard {summary['shard']} done: {totals['docs']} docs in {elapsed:.1f}s, "
+                    f"{totals['docs'] / elapsed:.2f} docs/s, {totals['chars'] / elapsed:.0f} chars/s")
+
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(anonymizer_options, _threads_per_worker(workers))
+        )
+    else:
+        _init_worker(anonymizer_options, _threads_per_worker(1))
+
+    futures: Set[Future] = set()
+    try:
+        for shard_index, records in _shards(iter_records(input_path, text_column, id_column), shard_size):
+            if manifest.is_done(shard_index):
+                totals['skipped_shards'] += 1
+                continue
+            path = os.path.join(output_dir, f"shard-{shard_index:05d}.{output_format}")
+
+            if executor is None:
+                record_done(_anonymize_shard(shard_index, records, path, output_format))
+                continue
+
+            # Keep a bounded number of shards in flight so the input is streamed
+            if len(futures) >= 2 * workers:
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record_done(future.result())
+            futures.add(executor.submit(_anonymize_shard, shard_index, records, path, output_format))
+
+        for future in wait(futures).done:
+            record_done(future.result())
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    totals['seconds'] = round(elapsed, 1)
+    logger.info(f"Batch finished: {totals['docs']} docs, {totals['shards']} shards written, "
+                f"{totals['skipped_shards']} shards already done, {elapsed:.1f}s")
+    return totals
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Anonymize a corpus of medical notes")
+    parser.add_argument("input", help="Directory of .txt files, .csv or .jsonl file")
+    parser.add_argument("output_dir", help="Directory for the shards and the checkpoint manifest")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="jsonl")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--shard-size", type=int, default=500)
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--id-column", default="id")
+    parser.add_argument("--chunking", default="chars", choices=("chars", "tokens", "strided"))
+    parser.add_argument("--confidence-threshold", type=float, default=0.5)
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    run_batch(
+        args.input,
+        args.output_dir,
+        output_format=args.format,
+        workers=args.workers,
+        shard_size=args.shard_size,
+        text_column=args.text_column,
+        id_column=args.id_column,
+        anonymizer_options={'chunking': args.chunking, 'confidence_threshold': args.confidence_threshold}
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Per-chunk latency of the two entity alignment modes:
+- fast: character offsets from the fast tokenizer offset mapping
+- slow: slow tokenizer + search of each entity word in the chunk text
+
+Run from the repository root:
+    python src/data_anonymization/benchmarks/bench_alignment.py
+"""
+import os
+import sys
+import statistics
+import time
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, SRC)
+
+from data_anonymization import PiranhaPIIModel, CamembertNERWithDatesModel, get_model_registry
+from data_anonymization.core.text_splitter import PositionAwareTextSplitter
+from data_anonymization.test_anonymizer import FRENCH_MEDICAL_TEXT
+
+REPEATS = 5
+
+
+def time_per_chunk(model, chunks, repeats=REPEATS):
+    """Return per-chunk latencies in ms and the entities of the last run"""
+    latencies = []
+    entities = []
+    for _ in range(repeats):
+        entities = []
+        for chunk in chunks:
+            start = time.perf_counter()
+            entities.extend(model.detect_entities_in_chunk(chunk))
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, entities
+
+
+def main():
+    # Repeat the note so that the same names appear several times per document
+    text = "\n".join([FRENCH_MEDICAL_TEXT] * 4)
+    chunks = PositionAwareTextSplitter(chunk_size=500, chunk_overlap=100).split_text_with_positions(text)
+    registry = get_model_registry()
+
+    print(f"{len(chunks)} chunks, {len(text)} chars, {REPEATS} repeats\n")
+    print(f"{'model':28} {'mode':5} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'entities':>9}")
+
+    for model_cls in (PiranhaPIIModel, CamembertNERWithDatesModel):
+        spans = {}
+        for use_fast in (True, False):
+            model = registry.get(model_cls, use_fast=use_fast)
+            # Warm-up call so that lazy initialisation is not measured
+            model.detect_entities_in_chunk(chunks[0])
+
+            latencies, entities = time_per_chunk(model, chunks)
+            mode = "fast" if model.use_fast else "slow"
+            spans[mode] = {(e.start_pos, e.end_pos, e.entity_type) for e in entities}
+            p95 = statistics.quantiles(latencies, n=20)[-1]
+            print(f"{model_cls.__name__:28} {mode:5} {statistics.mean(latencies):8.1f} "
+                  f"{statistics.median(latencies):8.1f} {p95:8.1f} {len(entities):9}")
+
+            registry.evict(model_cls, use_fast=use_fast)
+
+        if len(spans) == 2:
+            print(f"{'':28} spans only in fast: {len(spans['fast'] - spans['slow'])}, "
+                  f"only in slow: {len(spans['slow'] - spans['fast'])}")
+
+
+if __name__ == "__main__":
+    main()
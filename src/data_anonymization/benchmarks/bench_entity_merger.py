@@ -0,0 +1,59 @@
+"""
+Stress benchmark for EntityMerger on large synthetic entity sets
+
+Entities mimic two models over overlapping chunks: most spans are reported
+several times with small boundary jitter and different scores.
+
+Run from the repository root:
+    python src/data_anonymization/benchmarks/bench_entity_merger.py
+"""
+import os
+import random
+import sys
+import time
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, SRC)
+
+from data_anonymization.core.entities import Entity
+from data_anonymization.processors.entity_merger import EntityMerger
+
+SIZES = [1_000, 10_000, 100_000]
+ENTITY_TYPES = ["NAME", "DATE", "LOCATION", "PHONE", "ADDRESS"]
+
+
+def synthetic_entities(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    entities = []
+    position = 0
+    while len(entities) < count:
+        position += rng.randint(5, 60)
+        length = rng.randint(3, 25)
+        entity_type = rng.choice(ENTITY_TYPES)
+        # Same mention seen by 1 to 4 (model, chunk) pairs
+        for _ in range(rng.randint(1, 4)):
+            jitter = rng.choice([0, 0, 0, 1, -1])
+            start = position + max(jitter, 0)
+            entities.append(Entity(
+                text="x" * length,
+                entity_type=entity_type,
+                score=rng.random(),
+                start_pos=start,
+                end_pos=position + length + jitter
+            ))
+    rng.shuffle(entities)
+    return entities[:count]
+
+
+def main():
+    print(f"{'entities':>9} {'merged':>8} {'time ms':>9} {'us/entity':>10}")
+    for size in SIZES:
+        entities = synthetic_entities(size)
+        start = time.perf_counter()
+        merged = EntityMerger.merge_entities(entities, confidence_threshold=0.5)
+        elapsed = time.perf_counter() - start
+        print(f"{size:9} {len(merged):8} {elapsed * 1000:9.1f} {elapsed / size * 1e6:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
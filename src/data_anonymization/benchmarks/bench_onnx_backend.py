@@ -0,0 +1,64 @@
+"""
+Latency and throughput of the PyTorch and ONNX Runtime inference backends
+on the French sample note, with the entity spans each backend finds
+
+The first ONNX run exports the models to the cache directory
+(ANONYMIZATION_CACHE_DIR), later runs load the cached graphs.
+
+Run from the repository root:
+    python src/data_anonymization/benchmarks/bench_onnx_backend.py
+"""
+import os
+import sys
+import statistics
+import time
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, SRC)
+
+from data_anonymization import PiranhaPIIModel, CamembertNERWithDatesModel, get_model_registry
+from data_anonymization.core.text_splitter import PositionAwareTextSplitter
+from data_anonymization.test_anonymizer import FRENCH_MEDICAL_TEXT
+
+REPEATS = 5
+BATCH_SIZE = 8
+
+
+def main():
+    text = "\n".join([FRENCH_MEDICAL_TEXT] * 4)
+    chunks = PositionAwareTextSplitter(chunk_size=500, chunk_overlap=100).split_text_with_positions(text)
+    registry = get_model_registry()
+
+    print(f"{len(chunks)} chunks, {len(text)} chars, {REPEATS} repeats, batch size {BATCH_SIZE}\n")
+    print(f"{'model':28} {'backend':8} {'load s':>7} {'mean ms':>8} {'p95 ms':>8} {'chunks/s':>9} {'MB':>7} {'entities':>9}")
+
+    for model_cls in (PiranhaPIIModel, CamembertNERWithDatesModel):
+        spans = {}
+        for backend in ("torch", "onnx"):
+            start = time.perf_counter()
+            model = registry.get(model_cls, backend=backend)
+            load = time.perf_counter() - start
+            # Warm-up call so that lazy initialisation is not measured
+            model.detect_entities_in_chunks(chunks[:BATCH_SIZE], batch_size=BATCH_SIZE)
+
+            latencies = []
+            entities = []
+            for _ in range(REPEATS):
+                start = time.perf_counter()
+                entities = model.detect_entities_in_chunks(chunks, batch_size=BATCH_SIZE)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+            spans[backend] = {(e.start_pos, e.end_pos, e.entity_type) for e in entities}
+            mean = statistics.mean(latencies)
+            p95 = statistics.quantiles(latencies, n=20)[-1]
+            print(f"{model_cls.__name__:28} {backend:8} {load:7.1f} {mean:8.1f} {p95:8.1f} "
+                  f"{len(chunks) / (mean / 1000):9.1f} {model.memory_footprint() / 1024 ** 2:7.1f} {len(entities):9}")
+
+            registry.evict(model_cls, backend=backend)
+
+        print(f"{'':28} spans only in torch: {len(spans['torch'] - spans['onnx'])}, "
+              f"only in onnx: {len(spans['onnx'] - spans['torch'])}")
+
+
+if __name__ == "__main__":
+    main()
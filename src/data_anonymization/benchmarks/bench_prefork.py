@@ -0,0 +1,51 @@
+"""
+Spawned workers loading their own models vs workers forked from a parent
+holding them: startup time and per-worker RSS/PSS after one anonymization
+
+PSS splits shared pages between processes, its sum is the real footprint.
+Linux only for the memory columns (/proc/<pid>/smaps_rollup).
+
+Run from the repository root:
+    python src/data_anonymization/benchmarks/bench_prefork.py
+"""
+import os
+import sys
+import time
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, SRC)
+
+from data_anonymization import MedicalTextAnonymizer
+from data_anonymization.test_anonymizer import FRENCH_MEDICAL_TEXT
+from data_anonymization.utils import process_memory
+
+NUM_WORKERS = 4
+
+
+def main():
+    text = "\n".join([FRENCH_MEDICAL_TEXT] * 4)
+    print(f"{NUM_WORKERS} workers, {len(text)} chars\n")
+    print(f"{'backend':10} {'init s':>7} {'workers s':>9} {'parent RSS':>10} {'worker RSS':>10} "
+          f"{'worker PSS':>10} {'total PSS':>9}")
+
+    # Spawned workers first, while this process holds no model
+    for backend in ("processes", "prefork"):
+        start = time.perf_counter()
+        anonymizer = MedicalTextAnonymizer(execution_backend=backend, num_workers=NUM_WORKERS,
+                                           use_entity_cache=False)
+        init_seconds = time.perf_counter() - start
+        anonymizer.anonymize_text(text)
+
+        executor = anonymizer.executor
+        workers = executor.worker_memory()  # type: ignore
+        parent = process_memory()
+        worker_rss = sum(w.get('rss_mb', 0) for w in workers) / len(workers)
+        worker_pss = sum(w.get('pss_mb', 0) for w in workers) / len(workers)
+        total_pss = parent.get('pss_mb', 0) + sum(w.get('pss_mb', 0) for w in workers)
+        print(f"{backend:10} {init_seconds:7.1f} {executor.startup_seconds:9.1f} "  # type: ignore
+              f"{parent.get('rss_mb', 0):10.0f} {worker_rss:10.0f} {worker_pss:10.0f} {total_pss:9.0f}")
+        anonymizer.close()
+
+
+if __name__ == "__main__":
+    main()
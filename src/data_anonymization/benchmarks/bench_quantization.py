@@ -0,0 +1,73 @@
+"""
+fp32 vs dynamic int8 quantization of the NER models on CPU: latency,
+weight memory and the entity delta of the int8 model against fp32
+
+The ONNX rows are skipped when optimum[onnxruntime] is not installed.
+Quantized models are cached in ANONYMIZATION_CACHE_DIR after the first run.
+
+Run from the repository root:
+    python src/data_anonymization/benchmarks/bench_quantization.py
+"""
+import importlib.util
+import os
+import sys
+import statistics
+import time
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, SRC)
+
+from data_anonymization import PiranhaPIIModel, CamembertNERWithDatesModel, get_model_registry
+from data_anonymization.core.text_splitter import PositionAwareTextSplitter
+from data_anonymization.test_anonymizer import FRENCH_MEDICAL_TEXT
+from data_anonymization.utils import entity_delta
+
+REPEATS = 5
+BATCH_SIZE = 8
+
+
+def run(model, chunks):
+    """Mean latency in ms over REPEATS runs and the entities of the last run"""
+    model.detect_entities_in_chunks(chunks[:BATCH_SIZE], batch_size=BATCH_SIZE)
+    latencies = []
+    entities = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        entities = model.detect_entities_in_chunks(chunks, batch_size=BATCH_SIZE)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.mean(latencies), entities
+
+
+def main():
+    text = "\n".join([FRENCH_MEDICAL_TEXT] * 4)
+    chunks = PositionAwareTextSplitter(chunk_size=500, chunk_overlap=100).split_text_with_positions(text)
+    registry = get_model_registry()
+    backends = ["torch"]
+    if importlib.util.find_spec("optimum") is not None:
+        backends.append("onnx")
+
+    print(f"{len(chunks)} chunks, {len(text)} chars, {REPEATS} repeats, batch size {BATCH_SIZE}\n")
+    print(f"{'model':28} {'backend':8} {'dtype':5} {'mean ms':>8} {'speedup':>8} {'MB':>7} "
+          f"{'entities':>9} {'recall':>7} {'precision':>9} {'type diff':>9}")
+
+    for model_cls in (PiranhaPIIModel, CamembertNERWithDatesModel):
+        for backend in backends:
+            model = registry.get(model_cls, backend=backend)
+            fp32_ms, fp32_entities = run(model, chunks)
+            fp32_mb = model.memory_footprint() / 1024 ** 2
+            registry.evict(model_cls, backend=backend)
+
+            model = registry.get(model_cls, backend=backend, quantize=True)
+            int8_ms, int8_entities = run(model, chunks)
+            int8_mb = model.memory_footprint() / 1024 ** 2
+            registry.evict(model_cls, backend=backend, quantize=True)
+
+            delta = entity_delta(fp32_entities, int8_entities)
+            print(f"{model_cls.__name__:28} {backend:8} {'fp32':5} {fp32_ms:8.1f} {1.0:8.2f} {fp32_mb:7.1f} "
+                  f"{len(fp32_entities):9}")
+            print(f"{model_cls.__name__:28} {backend:8} {'int8':5} {int8_ms:8.1f} {fp32_ms / int8_ms:8.2f} {int8_mb:7.1f} "
+                  f"{len(int8_entities):9} {delta['recall']:7.3f} {delta['precision']:9.3f} {delta['type_changed']:9}")
+
+
+if __name__ == "__main__":
+    main()
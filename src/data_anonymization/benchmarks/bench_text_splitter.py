@@ -0,0 +1,73 @@
+"""
+Micro-benchmark of PositionAwareTextSplitter on multi-megabyte documents
+
+Compares the precomputed sentence boundary index with the previous approach,
+which re-sliced a 200-char window and ran an uncompiled regex per chunk.
+
+Run from the repository root:
+    python src/data_anonymization/benchmarks/bench_text_splitter.py
+"""
+import os
+import re
+import sys
+import time
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, SRC)
+
+from data_anonymization.core.entities import ChunkWithPosition
+from data_anonymization.core.text_splitter import PositionAwareTextSplitter
+from data_anonymization.test_anonymizer import FRENCH_MEDICAL_TEXT
+
+SIZES_MB = [1, 4, 16]
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 100
+
+
+def legacy_split(text: str, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP):
+    """Chunks computed the way the splitter used to, for reference"""
+    chunks = []
+    text_length = len(text)
+    current_pos = 0
+    while current_pos < text_length:
+        end_pos = min(current_pos + chunk_size, text_length)
+        if end_pos < text_length:
+            search_start = max(current_pos, end_pos - 100)
+            remaining_text = text[search_start:end_pos + 100]
+            sentence_breaks = [m.end() for m in re.finditer(r'[.!?]\s+', remaining_text)]
+            if sentence_breaks:
+                end_pos = search_start + sentence_breaks[-1]
+        chunks.append(ChunkWithPosition(
+            text=text[current_pos:end_pos],
+            start_offset=current_pos,
+            end_offset=end_pos,
+            chunk_index=len(chunks)
+        ))
+        current_pos = end_pos - chunk_overlap
+        if current_pos <= chunks[-1].start_offset:
+            current_pos = end_pos
+    return chunks
+
+
+def main():
+    splitter = PositionAwareTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+
+    print(f"{'size MB':>8} {'chunks':>8} {'index ms':>9} {'legacy ms':>10} {'MB/s':>8}")
+    for size_mb in SIZES_MB:
+        repeats = size_mb * 1024 * 1024 // len(FRENCH_MEDICAL_TEXT) + 1
+        text = "\n".join([FRENCH_MEDICAL_TEXT] * repeats)[:size_mb * 1024 * 1024]
+
+        start = time.perf_counter()
+        chunks = splitter.split_text_with_positions(text)
+        indexed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        reference = legacy_split(text)
+        legacy = time.perf_counter() - start
+
+        assert chunks == reference
+        print(f"{size_mb:8} {len(chunks):8} {indexed * 1000:9.1f} {legacy * 1000:10.1f} {size_mb / indexed:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import re
+from dataclasses import dataclass
+from typing import List, Set, Tuple
+from .entities import ChunkWithPosition, Entity
+
+# Digits or '@', what phone numbers, emails, addresses and IDs need
+_CONTACT_CANDIDATE = re.compile(r"[\d@]")
+
+
+@dataclass
+class CascadePolicy:
+    """
+    Run the first model on every chunk and the second one only on the chunks
+    where the first found a trigger entity type or was not confident enough
+    """
+    first: str = "camembert"
+    second: str = "piranha"
+    trigger_types: Tuple[str, ...] = ("NAME", "DATE")
+    # First-model entities scored below the margin also send their chunk to the second model
+    margin: float = 0.85
+
+    def is_conclusive(self, entities: List[Entity]) -> bool:
+        """True when the first model's entities of a chunk need no second opinion"""
+        return not any(e.entity_type in self.trigger_types or e.score < self.margin for e in entities)
+
+    def select(self, chunks: List[ChunkWithPosition], first_entities: List[Entity],
+               escalate_contacts: bool = False) -> List[ChunkWithPosition]:
+        """
+        Chunks the second model has to read
+        With escalate_contacts, chunks holding digits or '@' are read too, since only
+        the second model (or the regex rules) finds phones, emails and addresses
+        """
+        inconclusive: Set[int] = set()
+        by_chunk = {}
+        for entity in first_entities:
+            by_chunk.setdefault(entity.chunk_index, []).append(entity)
+
+        for chunk_index, entities in by_chunk.items():
+            if not self.is_conclusive(entities):
+                inconclusive.add(chunk_index)
+
+        if escalate_contacts:
+            inconclusive.update(chunk.chunk_index for chunk in chunks if _CONTACT_CANDIDATE.search(chunk.text))
+
+        return [chunk for chunk in chunks if chunk.chunk_index in inconclusive]
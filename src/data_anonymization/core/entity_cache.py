@@ -0,0 +1,203 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+from .entities import ChunkWithPosition, Entity
+
+logger = logging.getLogger(__name__)
+
+
+class EntityCache:
+    """
+    Content-addressed cache of the entities a model finds in a chunk
+    Entities are stored with chunk-local positions, so a chunk text seen at a
+    new place in a document is served with its new global positions
+    """
+
+    def __init__(self, max_entries: int = 10000, db_path: Optional[str] = None):
+        """
+        Args:
+            max_entries: Size of the in-memory LRU tier
+            db_path: Optional SQLite file, a persistent tier shared by processes and runs
+        """
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries: "OrderedDict[str, List[dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS entities (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._db.commit()
+            logger.info(f"Entity cache backed by {db_path}")
+
+    @staticmethod
+    def make_key(chunk_text: str, model_id: str, revision: Optional[str], threshold: float,
+                 options: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Hash of everything the cached entities depend on
+        options holds the inference settings that change the output (chunking mode, stride, max_length)
+        """
+        payload = json.dumps([chunk_text, model_id, revision, threshold, options or {}], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _read(self, key: str) -> Optional[List[dict]]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                return value
+
+            if self._db is None:
+                return None
+            row = self._db.execute("SELECT value FROM entities WHERE key = ?", (key,)).fetchone()
+
+        if row is None:
+            return None
+        value = json.loads(row[0])
+        self._remember(key, value)
+        return value
+
+    def _remember(self, key: str, value: List[dict]) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def lookup(self, key: str, chunk: ChunkWithPosition) -> Optional[List[Entity]]:
+        """Entities cached under key placed at the chunk's global position, None on a miss"""
+        value = self._read(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        return [
+            Entity(**{
+                **local,
+                'start_pos': chunk.start_offset + local['start_pos'],
+                'end_pos': chunk.start_offset + local['end_pos'],
+                'chunk_index': chunk.chunk_index
+            })
+            for local in value
+        ]
+
+    def store(self, key: str, chunk: ChunkWithPosition, entities: List[Entity]) -> None:
+        """Cache the entities found in a chunk, an empty list is cached too"""
+        value = []
+        for entity in entities:
+            local = asdict(entity)
+            local['start_pos'] -= chunk.start_offset
+            local['end_pos'] -= chunk.start_offset
+            local['score'] = float(local['score'])
+            del local['chunk_index']
+            value.append(local)
+
+        self._remember(key, value)
+        if self._db is not None:
+            with self._lock:
+                self._db.execute("INSERT OR REPLACE INTO entities (key, value) VALUES (?, ?)",
+                                 (key, json.dumps(value)))
+                self._db.commit()
+
+    def clear(self) -> None:
+        """Drop every entry of both tiers and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM entities")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, float]:
+        """Lifetime hit and miss counters of the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'entries': len(self._entries)
+            }
+
+
+def split_cached(cache: EntityCache, chunks: List[ChunkWithPosition], model_id: str, revision: Optional[str],
+                 threshold: float, options: Optional[Dict[str, Any]] = None) -> Tuple[List[Entity], List[Tuple[str, ChunkWithPosition]], List[Tuple[str, ChunkWithPosition]]]:
+    """
+    Entities of the cached chunks, the (key, chunk) pairs the model still has to
+    read, and the repeats of those chunks, served by resolve_repeats once stored
+    """
+    cached: List[Entity] = []
+    missing = []
+    repeats = []
+    pending = set()
+    for chunk in chunks:
+        key = cache.make_key(chunk.text, model_id, revision, threshold, options)
+        if key in pending:
+            repeats.append((key, chunk))
+            continue
+
+        entities = cache.lookup(key, chunk)
+        if entities is None:
+            missing.append((key, chunk))
+            pending.add(key)
+        else:
+            cached.extend(entities)
+    return cached, missing, repeats
+
+
+def store_results(cache: EntityCache, missing: List[Tuple[str, ChunkWithPosition]],
+                  entities: List[Entity]) -> Dict[str, Tuple[ChunkWithPosition, List[Entity]]]:
+    """Cache the entities the model found for each missing chunk, returned by key"""
+    by_chunk: Dict[int, List[Entity]] = {chunk.chunk_index: [] for _, chunk in missing}
+    for entity in entities:
+        if entity.chunk_index in by_chunk:
+            by_chunk[entity.chunk_index].append(entity)
+
+    stored = {}
+    for key, chunk in missing:
+        cache.store(key, chunk, by_chunk[chunk.chunk_index])
+        stored[key] = (chunk, by_chunk[chunk.chunk_index])
+    return stored
+
+
+def resolve_repeats(repeats: List[Tuple[str, ChunkWithPosition]],
+                    stored: Dict[str, Tuple[ChunkWithPosition, List[Entity]]]) -> List[Entity]:
+    """Entities of chunks whose text was read once earlier in the same call"""
+    entities = []
+    for key, chunk in repeats:
+        source, found = stored[key]
+        shift = chunk.start_offset - source.start_offset
+        entities.extend(
+            replace(e, start_pos=e.start_pos + shift, end_pos=e.end_pos + shift, chunk_index=chunk.chunk_index)
+            for e in found
+        )
+    return entities
+
+
+_default_cache: Optional[EntityCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_entity_cache() -> EntityCache:
+    """
+    Return the process-wide entity cache
+    Set ANONYMIZATION_ENTITY_CACHE_DB to a SQLite path to persist it
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = EntityCache(db_path=os.environ.get('ANONYMIZATION_ENTITY_CACHE_DB'))
+        return _default_cache
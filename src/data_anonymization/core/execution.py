@@ -0,0 +1,265 @@
+import gc
+import logging
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import torch
+from langchain_core.runnables import RunnableParallel, RunnableLambda
+
+from .entities import ChunkWithPosition, Entity
+from ..utils import process_memory
+
+logger = logging.getLogger(__name__)
+
+# (model key, chunks) pairs, e.g. ('piranha', chunks)
+ModelTask = Tuple[str, List[ChunkWithPosition]]
+# Returns the models keyed like the tasks, must be picklable for the process backend
+ModelFactory = Callable[[], Dict[str, object]]
+
+EXECUTION_BACKENDS = ("serial", "threads", "processes", "prefork")
+
+
+def _threads_per_worker(num_workers: int) -> int:
+    """Split the cores between workers so torch intra-op pools do not oversubscribe"""
+    return max(1, (os.cpu_count() or 1) // num_workers)
+
+
+def _split_tasks(tasks: List[ModelTask], num_workers: int, batch_size: int) -> List[Tuple[int, str, List[ChunkWithPosition]]]:
+    """Cut each model task into contiguous chunk groups, at most one per worker and at least one batch each"""
+    sub_tasks = []
+    for task_index, (model_key, chunks) in enumerate(tasks):
+        if not chunks:
+            continue
+        groups = max(1, min(num_workers, math.ceil(len(chunks) / max(batch_size, 1))))
+        group_size = math.ceil(len(chunks) / groups)
+        for start in range(0, len(chunks), group_size):
+            sub_tasks.append((task_index, model_key, chunks[start:start + group_size]))
+    return sub_tasks
+
+
+class ExecutionBackend:
+    """Runs model tasks over chunks and returns the entities of each task"""
+
+    name = "base"
+
+    def __init__(self, model_factory: ModelFactory, num_workers: int = 1, batch_size: int = 8):
+        self.model_factory = model_factory
+        self.num_workers = max(1, num_workers)
+        self.batch_size = batch_size
+
+    def run(self, tasks: List[ModelTask], **inference_options) -> List[List[Entity]]:
+        """inference_options are forwarded to PIIModel.detect_entities_in_chunks"""
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        """Release workers, a no-op for in-process backends"""
+
+
+class SerialBackend(ExecutionBackend):
+    """Runs every task in the calling thread"""
+
+    name = "serial"
+
+    def run(self, tasks: List[ModelTask], **inference_options) -> List[List[Entity]]:
+        models = self.model_factory()
+        return [
+            models[model_key].detect_entities_in_chunks(  # type: ignore
+                chunks, batch_size=self.batch_size, **inference_options)
+            for model_key, chunks in tasks
+        ]
+
+
+class ThreadBackend(ExecutionBackend):
+    """
+    Runs chunk groups on a thread pool
+    torch releases the GIL during forward passes. With limit_torch_threads the
+    intra-op thread pool is sized so that workers x threads matches the number
+    of cores, otherwise torch's own setting is left untouched
+    """
+
+    name = "threads"
+
+    def __init__(self, model_factory: ModelFactory, num_workers: int = 2, batch_size: int = 8,
+                 limit_torch_threads: bool = False):
+        super().__init__(model_factory, num_workers, batch_size)
+        if limit_torch_threads:
+            # torch.set_num_threads is process-wide, it also caps any other torch code of the process
+            torch.set_num_threads(_threads_per_worker(self.num_workers))
+        self.torch_threads = torch.get_num_threads()
+        logger.info(f"Thread backend: {self.num_workers} workers x {self.torch_threads} torch threads")
+
+    def run(self, tasks: List[ModelTask], **inference_options) -> List[List[Entity]]:
+        models = self.model_factory()
+        sub_tasks = _split_tasks(tasks, self.num_workers, self.batch_size)
+
+        parallel_chain = RunnableParallel(**{
+            f"task_{i}": RunnableLambda(
+                lambda _input, model_key=model_key, chunks=chunks: models[model_key].detect_entities_in_chunks(  # type: ignore
+                    chunks, batch_size=self.batch_size, **inference_options)
+            )
+            for i, (_, model_key, chunks) in enumerate(sub_tasks)
+        })  # type: ignore
+        results = parallel_chain.invoke({}, config={"max_concurrency": self.num_workers})
+
+        entities: List[List[Entity]] = [[] for _ in tasks]
+        for i, (task_index, _, _) in enumerate(sub_tasks):
+            entities[task_index].extend(results[f"task_{i}"])
+        return entities
+
+
+# Models held by each process pool worker, loaded once by _init_process_worker
+_WORKER_MODELS: Dict[str, object] = {}
+
+
+def _init_process_worker(model_factory: ModelFactory, torch_threads: int, ready) -> None:
+    torch.set_num_threads(torch_threads)
+    _WORKER_MODELS.update(model_factory())
+    logger.info(f"Worker {os.getpid()} ready with {torch_threads} torch threads")
+    # Hold the first task until every worker is up, so each one receives one of the startup tasks
+    ready.wait()
+
+
+def _init_prefork_worker(models: Dict[str, object], torch_threads: int, ready) -> None:
+    """Forked workers receive the parent's models unpickled, the fork context does not serialize initargs"""
+    torch.set_num_threads(torch_threads)
+    _WORKER_MODELS.update(models)
+    logger.info(f"Forked worker {os.getpid()} ready with {torch_threads} torch threads")
+    ready.wait()
+
+
+def _worker_started() -> None:
+    pass
+
+
+def _run_process_task(model_key: str, chunks: List[ChunkWithPosition], batch_size: int,
+                      inference_options: Dict[str, object]) -> List[Entity]:
+    return _WORKER_MODELS[model_key].detect_entities_in_chunks(  # type: ignore
+        chunks, batch_size=batch_size, **inference_options)
+
+
+class ProcessBackend(ExecutionBackend):
+    """
+    Runs chunk groups on a process pool whose workers each hold the models
+    Workers start on the first call and are reused until shutdown()
+    """
+
+    name = "processes"
+
+    def __init__(self, model_factory: ModelFactory, num_workers: int = 2, batch_size: int = 8,
+                 start_method: str = "spawn"):
+        super().__init__(model_factory, num_workers, batch_size)
+        self.start_method = start_method
+        self.torch_threads = _threads_per_worker(self.num_workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.worker_pids: List[int] = []
+        # Seconds from pool creation until every worker held its models
+        self.startup_seconds: Optional[float] = None
+
+    def _worker_initializer(self, ready) -> Tuple[Callable, tuple]:
+        return _init_process_worker, (self.model_factory, self.torch_threads, ready)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            logger.info(f"Starting {self.num_workers} worker processes ({self.start_method}), "
+                        f"{self.torch_threads} torch threads each")
+            start = time.perf_counter()
+            context = multiprocessing.get_context(self.start_method)
+            ready = context.Barrier(self.num_workers)
+            initializer, initargs = self._worker_initializer(ready)
+            children = {p.pid for p in multiprocessing.active_children()}
+
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.num_workers,
+                mp_context=context,
+                initializer=initializer,
+                initargs=initargs
+            )
+            # Start every worker now and wait for all of them to load
+            startup_tasks = [self._executor.submit(_worker_started) for _ in range(self.num_workers)]
+            for future in startup_tasks:
+                future.result()
+
+            self.startup_seconds = time.perf_counter() - start
+            self.worker_pids = [p.pid for p in multiprocessing.active_children() if p.pid not in children]
+            logger.info(f"{self.num_workers} workers ready in {self.startup_seconds:.1f}s")
+        return self._executor
+
+    def worker_memory(self) -> List[Dict[str, Any]]:
+        """RSS, PSS, shared and private memory of each worker, from /proc on Linux"""
+        return [{'pid': pid, **process_memory(pid)} for pid in self.worker_pids]
+
+    def run(self, tasks: List[ModelTask], **inference_options) -> List[List[Entity]]:
+        executor = self._get_executor()
+        sub_tasks = _split_tasks(tasks, self.num_workers, self.batch_size)
+
+        futures = [
+            (task_index, executor.submit(_run_process_task, model_key, chunks, self.batch_size, inference_options))
+            for task_index, model_key, chunks in sub_tasks
+        ]
+
+        entities: List[List[Entity]] = [[] for _ in tasks]
+        for task_index, future in futures:
+            entities[task_index].extend(future.result())
+        return entities
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self.worker_pids = []
+
+
+class PreforkBackend(ProcessBackend):
+    """
+    Process pool forked from a parent that already holds the models
+    Workers share the weight pages copy-on-write instead of loading their own
+    copy. The pool is forked at construction, before the parent runs any
+    forward pass, since OpenMP thread pools do not survive a fork.
+    """
+
+    name = "prefork"
+
+    def __init__(self, model_factory: ModelFactory, num_workers: int = 2, batch_size: int = 8):
+        super().__init__(model_factory, num_workers, batch_size, start_method="fork")
+        # Held by the instance, so that two backends in one process keep their own models
+        self.models = model_factory()
+        # Move the loaded objects out of the collector's reach, collections in the
+        # workers would otherwise write to their headers and copy the pages
+        gc.freeze()
+        self._frozen = True
+        self._get_executor()
+
+    def _worker_initializer(self, ready) -> Tuple[Callable, tuple]:
+        return _init_prefork_worker, (self.models, self.torch_threads, ready)
+
+    def shutdown(self) -> None:
+        super().shutdown()
+        if self._frozen:
+            # Hand the frozen objects back to the collector so the parent can free them
+            gc.unfreeze()
+            self._frozen = False
+
+
+def create_execution_backend(name: str, model_factory: ModelFactory, num_workers: Optional[int] = None,
+                             batch_size: int = 8, limit_torch_threads: bool = False) -> ExecutionBackend:
+    """
+    Build the backend by name, num_workers defaults to one worker per model
+    limit_torch_threads lets the threads backend split the cores between its workers
+    """
+    if num_workers is None:
+        num_workers = 2
+
+    if name == "serial":
+        return SerialBackend(model_factory, 1, batch_size)
+    if name == "threads":
+        return ThreadBackend(model_factory, num_workers, batch_size, limit_torch_threads)
+    if name == "processes":
+        return ProcessBackend(model_factory, num_workers, batch_size)
+    if name == "prefork":
+        return PreforkBackend(model_factory, num_workers, batch_size)
+
+    raise ValueError(f"Unknown execution backend '{name}', expected one of {EXECUTION_BACKENDS}")
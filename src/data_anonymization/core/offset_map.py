@@ -0,0 +1,53 @@
+from bisect import bisect_right
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List
+
+
+@dataclass
+class ReplacementSpan:
+    """Replaced entity span in original and anonymized coordinates"""
+    original_start: int
+    original_end: int
+    anonymized_start: int
+    anonymized_end: int
+    entity_type: str
+
+
+class OffsetMap:
+    """Maps character positions between the original and the anonymized text"""
+
+    def __init__(self, spans: List[ReplacementSpan]):
+        # Spans are produced in text order by TextAnonymizer
+        self.spans = spans
+        self._original_starts = [s.original_start for s in spans]
+        self._anonymized_starts = [s.anonymized_start for s in spans]
+
+    def to_anonymized(self, position: int) -> int:
+        """Original position to anonymized position, positions inside an entity map to its placeholder start"""
+        i = bisect_right(self._original_starts, position) - 1
+        if i < 0:
+            return position
+        span = self.spans[i]
+        if position < span.original_end:
+            return span.anonymized_start
+        return position + span.anonymized_end - span.original_end
+
+    def to_original(self, position: int) -> int:
+        """Anonymized position to original position, positions inside a placeholder map to the entity start"""
+        i = bisect_right(self._anonymized_starts, position) - 1
+        if i < 0:
+            return position
+        span = self.spans[i]
+        if position < span.anonymized_end:
+            return span.original_start
+        return position + span.original_end - span.anonymized_end
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return [asdict(s) for s in self.spans]
+
+    @classmethod
+    def from_list(cls, spans: List[Dict[str, Any]]) -> 'OffsetMap':
+        return cls([ReplacementSpan(**s) for s in spans])
+
+    def __len__(self):
+        return len(self.spans)
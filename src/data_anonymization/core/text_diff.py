@@ -0,0 +1,25 @@
+from typing import Tuple
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    """Length of the common prefix, by binary search on C-level slice comparisons"""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def edit_bounds(old: str, new: str) -> Tuple[int, int, int]:
+    """
+    Smallest single edit turning old into new
+    Returns (start, old_end, new_end): old[start:old_end] was replaced by new[start:new_end]
+    """
+    start = _common_prefix_length(old, new)
+    # The common suffix may not reach into the common prefix
+    max_suffix = min(len(old), len(new)) - start
+    suffix = _common_prefix_length(old[len(old) - max_suffix:][::-1], new[len(new) - max_suffix:][::-1])
+    return start, len(old) - suffix, len(new) - suffix
@@ -1,64 +1,199 @@
 import re
 import logging
-from typing import List
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from langchain_text_splitters import TextSplitter
 from .entities import ChunkWithPosition
 
 logger = logging.getLogger(__name__)
 
+CHUNKING_MODES = ("chars", "tokens")
+
+_SENTENCE_BREAK = re.compile(r'[.!?]\s+')
+_WHITESPACE_RUN = re.compile(r'\s+')
+
+
+class _SentenceIndex:
+    """Sorted sentence break positions of a whole document, built in one regex pass"""
+
+    def __init__(self, text: str):
+        self.text = text
+        # Break ends are only needed for the chosen break, they are computed on demand
+        self.starts = [match.start() for match in _SENTENCE_BREAK.finditer(text)]
+
+    def last_break(self, window_start: int, window_end: int) -> Optional[int]:
+        """
+        End of the last sentence break inside text[window_start:window_end]
+        Same result as searching the window slice: the break needs its punctuation
+        and at least one whitespace inside the window, its end is clipped to it
+        """
+        i = bisect_right(self.starts, window_end - 2) - 1
+        if i < 0 or self.starts[i] < window_start:
+            return None
+        whitespace = _WHITESPACE_RUN.match(self.text, self.starts[i] + 1, window_end)
+        return whitespace.end()  # type: ignore
+
+
+class _TokenIndex:
+    """Token start offsets of a whole document for one fast tokenizer"""
+
+    def __init__(self, tokenizer, text: str):
+        self.name = getattr(tokenizer, 'name_or_path', tokenizer.__class__.__name__)
+        self.special_tokens = tokenizer.num_special_tokens_to_add()
+        encoding = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        self.starts = [start for start, _ in encoding['offset_mapping']]
+
+    def count(self, start: int, end: int) -> int:
+        """Number of content tokens starting in text[start:end]"""
+        return bisect_left(self.starts, end) - bisect_left(self.starts, start)
+
+    def budget_end(self, start: int, budget: int, text_length: int) -> int:
+        """Furthest character end so that text[start:end] holds at most budget tokens"""
+        last = bisect_left(self.starts, start) + budget
+        return self.starts[last] if last < len(self.starts) else text_length
 
 
 class PositionAwareTextSplitter(TextSplitter):
     """Text splitter that tracks positions in original text"""
-    
-    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 100):
+
+    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 100,
+                 tokenizers: Optional[Sequence[Any]] = None,
+                 max_tokens: int = 510,
+                 chunking: str = "chars"):
+        """
+        Args:
+            chunk_size: Target chunk length in characters ('chars' mode)
+            chunk_overlap: Overlap between consecutive chunks in characters
+            tokenizers: Fast tokenizers of the models that will read the chunks,
+                used for token statistics and required by the 'tokens' mode
+            max_tokens: Token budget per chunk without special tokens
+            chunking: 'chars' sizes chunks by character count, 'tokens' by the
+                token count of every tokenizer
+        """
         super().__init__(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-        logger.info(f"Initialized splitter: chunk_size={chunk_size}, overlap={chunk_overlap}")
-    
-    def split_text_with_positions(self, text: str) -> List[ChunkWithPosition]:
-        """Split text into chunks while tracking original positions"""
+        if chunking not in CHUNKING_MODES:
+            raise ValueError(f"Unknown chunking mode '{chunking}', expected one of {CHUNKING_MODES}")
+
+        self.tokenizers = [t for t in (tokenizers or []) if getattr(t, 'is_fast', False)]
+        if chunking == "tokens" and not self.tokenizers:
+            raise ValueError("Token budget chunking needs at least one fast tokenizer")
+
+        self.max_tokens = max_tokens
+        self.chunking = chunking
+        logger.info(f"Initialized splitter: mode={chunking}, chunk_size={chunk_size}, "
+                    f"max_tokens={max_tokens}, overlap={chunk_overlap}")
+
+    def _char_budget_end(self, text: str, current_pos: int, sentences: _SentenceIndex) -> int:
+        """Chunk end for a character budget, moved to a nearby sentence break"""
+        text_length = len(text)
+        end_pos = min(current_pos + self._chunk_size, text_length)
+
+        # Try to break at sentence boundary if not at end
+        if end_pos < text_length:
+            # Look for the last sentence ending around the end of the chunk
+            search_start = max(current_pos, end_pos - 100)
+            last_break = sentences.last_break(search_start, min(end_pos + 100, text_length))
+            if last_break is not None:
+                end_pos = last_break
+
+        return end_pos
+
+    def _token_budget_end(self, text: str, current_pos: int, token_indexes: List[_TokenIndex],
+                          sentences: _SentenceIndex) -> int:
+        """
+        Chunk end for the token budget of every tokenizer
+        Breaks at the last sentence end, or else the last whitespace, in the
+        second half of the chunk so that the budget is never exceeded
+        """
+        text_length = len(text)
+        end_pos = min(index.budget_end(current_pos, self.max_tokens, text_length) for index in token_indexes)
+
+        if end_pos >= text_length:
+            return text_length
+
+        search_start = current_pos + (end_pos - current_pos) // 2
+
+        last_break = sentences.last_break(search_start, end_pos)
+        if last_break is not None:
+            return last_break
+
+        last_space = max(text.rfind(' ', search_start, end_pos), text.rfind('\n', search_start, end_pos))
+        if last_space > search_start:
+            return last_space + 1
+
+        return end_pos
+
+    def _split_stats(self, text: str, chunks: List[ChunkWithPosition], token_indexes: List[_TokenIndex]) -> Dict[str, Any]:
+        """Chunk count and per-tokenizer token usage, chunks over the budget get truncated or fail"""
+        stats: Dict[str, Any] = {
+            'mode': self.chunking,
+            'chunks': len(chunks),
+            'chars': len(text),
+            'max_tokens': self.max_tokens,
+            'truncated_chunks': 0,
+            'tokenizers': {}
+        }
+
+        over_budget = set()
+        for index in token_indexes:
+            counts = [index.count(c.start_offset, c.end_offset) for c in chunks]
+            over = [c.chunk_index for c, n in zip(chunks, counts) if n > self.max_tokens]
+            over_budget.update(over)
+            stats['tokenizers'][index.name] = {
+                'max_chunk_tokens': max(counts, default=0) + index.special_tokens,
+                'mean_chunk_tokens': round(sum(counts) / len(counts), 1) + index.special_tokens if counts else 0,
+                'truncated_chunks': len(over)
+            }
+
+        stats['truncated_chunks'] = len(over_budget)
+        if over_budget:
+            logger.warning(f"{len(over_budget)} chunks exceed the {self.max_tokens} token budget "
+                           f"and will be truncated: {sorted(over_budget)}")
+        return stats
+
+    def split_text_with_stats(self, text: str) -> Tuple[List[ChunkWithPosition], Dict[str, Any]]:
+        """Split text into chunks while tracking original positions, with chunking statistics"""
         chunks_with_pos = []
         text_length = len(text)
         current_pos = 0
         chunk_index = 0
-        
+
+        # Index sentence breaks and tokens of the whole document once
+        sentences = _SentenceIndex(text)
+        token_indexes = [_TokenIndex(tokenizer, text) for tokenizer in self.tokenizers]
+
         while current_pos < text_length:
             # Calculate end position
-            end_pos = min(current_pos + self._chunk_size, text_length)
-            
-            # Try to break at sentence boundary if not at end
-            if end_pos < text_length:
-                # Look for sentence endings in the last part of the chunk
-                search_start = max(current_pos, end_pos - 100)
-                remaining_text = text[search_start:end_pos + 100]
-                
-                # Find last sentence break
-                sentence_breaks = [m.end() for m in re.finditer(r'[.!?]\s+', remaining_text)]
-                if sentence_breaks:
-                    # Adjust end_pos to the last sentence break
-                    last_break = sentence_breaks[-1]
-                    end_pos = search_start + last_break
-            
+            if self.chunking == "tokens":
+                end_pos = self._token_budget_end(text, current_pos, token_indexes, sentences)
+            else:
+                end_pos = self._char_budget_end(text, current_pos, sentences)
+
             # Extract chunk text
             chunk_text = text[current_pos:end_pos]
-            
+
             chunks_with_pos.append(ChunkWithPosition(
                 text=chunk_text,
                 start_offset=current_pos,
                 end_offset=end_pos,
                 chunk_index=chunk_index
             ))
-            
+
             # Move to next chunk with overlap
             current_pos = end_pos - self._chunk_overlap
             if current_pos <= chunks_with_pos[-1].start_offset:
                 current_pos = end_pos  # Avoid infinite loop
-            
+
             chunk_index += 1
-        
+
         logger.info(f"Split text into {len(chunks_with_pos)} chunks")
-        return chunks_with_pos
-    
+        return chunks_with_pos, self._split_stats(text, chunks_with_pos, token_indexes)
+
+    def split_text_with_positions(self, text: str) -> List[ChunkWithPosition]:
+        """Split text into chunks while tracking original positions"""
+        chunks, _ = self.split_text_with_stats(text)
+        return chunks
+
     def split_text(self, text: str) -> List[str]:
         """Override to maintain compatibility"""
         chunks = self.split_text_with_positions(text)
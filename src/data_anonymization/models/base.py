@@ -1,38 +1,75 @@
 import logging
-from typing import List, Tuple
+import os
+from typing import List, Optional, Tuple
+import numpy as np
+import torch
 from transformers import AutoTokenizer, AutoModelForTokenClassification, pipeline
+from transformers.pipelines import AggregationStrategy
 from ..core.entities import Entity, ChunkWithPosition
+from ..utils import get_cache_dir
 
 logger = logging.getLogger(__name__)
 
+INFERENCE_BACKENDS = ("torch", "onnx")
+# Labels the token classification pipeline drops by default (ignore_labels)
+IGNORE_LABELS = ("O",)
+
+
+def load_fast_tokenizer(model_name: str, revision: Optional[str] = None):
+    """Load only the fast tokenizer of a model, None when it has none"""
+    try:
+        tokenizer = AutoTokenizer.from_pretrained(model_name, revision=revision, use_fast=True)
+    except Exception as e:
+        logger.warning(f"Fast tokenizer failed to load for {model_name}: {e}")
+        return None
+    return tokenizer if tokenizer.is_fast else None
+
 
 class PIIModel:
     """Base class for PII detection models with character-level position mapping"""
     
-    def __init__(self, model_name: str, task: str = "ner"):
+    MODEL_NAME = ""
+    
+    def __init__(self, model_name: str, task: str = "ner", use_fast: bool = True, backend: str = "torch",
+                 quantize: bool = False, revision: Optional[str] = None):
+        if backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"Unknown inference backend '{backend}', expected one of {INFERENCE_BACKENDS}")
+        
         self.model_name = model_name
+        # Hub revision (branch, tag or commit) of the weights, None for the default branch
+        self.revision = revision
         self.task = task
+        # Fast tokenizers expose real offset mappings, the slow ones need text search
+        self.use_fast = use_fast
+        # 'torch' runs the PyTorch weights, 'onnx' an ONNX Runtime export cached on disk
+        self.backend = backend
+        # Dynamic int8 quantization of the linear layers, cached on disk like ONNX exports
+        self.quantize = quantize
         self.pipeline = None
         self.tokenizer = None
+        self.model = None
+        # Serialized weights the model was loaded from, for ONNX and quantized models
+        self._model_file: Optional[str] = None
         self._load_model()
     
     def _load_model(self):
         """Load the model pipeline"""
         try:
-            logger.info(f"Loading model: {self.model_name}")
+            logger.info(f"Loading model: {self.model_name} ({self.backend}{', int8' if self.quantize else ''})")
             
-            model = AutoModelForTokenClassification.from_pretrained(self.model_name)
+            if self.backend == "onnx":
+                self.model = self._load_onnx_model()
+            elif self.quantize:
+                self.model = self._load_quantized_model()
+            else:
+                self.model = AutoModelForTokenClassification.from_pretrained(self.model_name, revision=self.revision)
 
-            # IMPORTANT FIX: disable fast tokenizer
-            self.tokenizer = AutoTokenizer.from_pretrained(
-                self.model_name,
-                use_fast=False
-            )
+            self.tokenizer = self._load_tokenizer()
             self.tokenizer.model_max_length = 520
 
             self.pipeline = pipeline(
                 self.task, # type: ignore
-                model=model,
+                model=self.model,
                 aggregation_strategy="simple",
                 tokenizer=self.tokenizer,
                 device=-1
@@ -44,110 +81,309 @@ class PIIModel:
             logger.error(f"Failed to load model {self.model_name}: {e}")
             raise
 
+    def _cache_dir(self, kind: str) -> str:
+        """Cache directory of a derived artifact of this model, e.g. 'onnx' or 'int8'"""
+        name = self.model_name.replace('/', '--')
+        if self.revision:
+            name = f"{name}@{self.revision}"
+        return get_cache_dir(kind, name)
     
-    def _get_char_positions(self, text: str, token_start: int, token_end: int) -> Tuple[int, int]:
+    def _load_quantized_model(self):
+        """Quantize the linear layers to int8 on first use, later loads read the cached module"""
+        self._model_file = os.path.join(self._cache_dir('int8'), 'model.pt')
+        if os.path.exists(self._model_file):
+            logger.info(f"Using cached int8 model {self._model_file}")
+            # Written by this method, the quantized module is pickled as a whole.
+            # mmap keeps the unquantized tensors in the page cache, shared by every process
+            return torch.load(self._model_file, weights_only=False, mmap=True)
+        
+        model = AutoModelForTokenClassification.from_pretrained(self.model_name, revision=self.revision)
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        torch.save(model, self._model_file)
+        logger.info(f"Saved int8 model to {self._model_file}")
+        return model
+    
+    def _load_onnx_model(self):
+        """Load the ONNX Runtime model, exporting (and quantizing) the checkpoint on first use"""
+        try:
+            from optimum.onnxruntime import ORTModelForTokenClassification, ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        except ImportError as e:
+            raise ImportError(
+                "The 'onnx' backend needs optimum with ONNX Runtime: pip install 'optimum[onnxruntime]'"
+            ) from e
+        
+        export_dir = self._cache_dir('onnx')
+        if not os.path.exists(os.path.join(export_dir, 'model.onnx')):
+            logger.info(f"Exporting {self.model_name} to ONNX in {export_dir}")
+            ORTModelForTokenClassification.from_pretrained(
+                self.model_name, revision=self.revision, export=True).save_pretrained(export_dir)
+        
+        if not self.quantize:
+            self._model_file = os.path.join(export_dir, 'model.onnx')
+            return ORTModelForTokenClassification.from_pretrained(export_dir)
+        
+        quantized_dir = self._cache_dir('onnx-int8')
+        self._model_file = os.path.join(quantized_dir, 'model_quantized.onnx')
+        if not os.path.exists(self._model_file):
+            logger.info(f"Quantizing the ONNX export of {self.model_name} to int8 in {quantized_dir}")
+            ORTQuantizer.from_pretrained(export_dir).quantize(
+                save_dir=quantized_dir,
+                quantization_config=AutoQuantizationConfig.avx2(is_static=False, per_channel=False))
+        return ORTModelForTokenClassification.from_pretrained(quantized_dir, file_name='model_quantized.onnx')
+    
+    def _load_tokenizer(self):
+        """Load the fast tokenizer when requested, falling back to the slow one"""
+        if self.use_fast:
+            tokenizer = load_fast_tokenizer(self.model_name, self.revision)
+            if tokenizer is not None:
+                return tokenizer
+            logger.warning(f"No fast tokenizer available for {self.model_name}, using slow alignment")
+            self.use_fast = False
+
+        return AutoTokenizer.from_pretrained(self.model_name, revision=self.revision, use_fast=False)
+
+    def memory_footprint(self) -> int:
+        """Memory held by the model parameters and buffers, in bytes"""
+        if self.model is None:
+            return 0
+        if self._model_file is not None:
+            # ONNX graphs and packed int8 weights are not parameters, use their serialized size
+            return os.path.getsize(self._model_file)
+        return self.model.get_memory_footprint()
+    
+    def _make_entity(self, chunk: ChunkWithPosition, entity_dict: dict, start_idx: int, end_idx: int) -> Entity:
+        """Build an entity from chunk-local character positions"""
+        return Entity(
+            text=chunk.text[start_idx:end_idx],
+            entity_type=entity_dict.get('entity_group', 'UNKNOWN'),
+            # The pipeline returns numpy scores, which json cannot serialize
+            score=float(entity_dict.get('score', 0.0)),
+            start_pos=chunk.start_offset + start_idx,
+            end_pos=chunk.start_offset + end_idx,
+            chunk_index=chunk.chunk_index,
+            model_source=self.__class__.__name__
+        )
+    
+    def _entities_from_raw(self, chunk: ChunkWithPosition, raw_entities: List[dict]) -> List[Entity]:
+        """Map pipeline output for one chunk to entities with global positions"""
+        if self.use_fast:
+            return self._align_with_offsets(chunk, raw_entities)
+        return self._align_by_search(chunk, raw_entities)
+    
+    def _align_with_offsets(self, chunk: ChunkWithPosition, raw_entities: List[dict]) -> List[Entity]:
         """
-        Convert token positions to character positions
-        This is CRITICAL for correct alignment
+        Use the character offsets the pipeline derives from the fast tokenizer
+        offset mapping, no search in the chunk text is needed
         """
-        # Tokenize the text
-        encoding = self.tokenizer(
-            text, return_offsets_mapping=True,
-            add_special_tokens=True)  # type: ignore
-        
-        offset_mapping = encoding['offset_mapping']
-        
-        # Handle special tokens and find character positions
-        char_start = None
-        char_end = None
-        
-        # Find the character start
-        if token_start < len(offset_mapping):
-            char_start = offset_mapping[token_start][0]
-        
-        # Find the character end
-        if token_end <= len(offset_mapping):
-            # token_end is exclusive, so we use token_end - 1 for the last token
-            if token_end > 0:
-                char_end = offset_mapping[token_end - 1][1]
-        
-        # Fallback: if we couldn't get proper positions
-        if char_start is None:
-            char_start = 0
-        if char_end is None:
-            char_end = len(text)
-        
-        return char_start, char_end
+        entities = []
+        
+        for entity_dict in raw_entities:
+            start_idx = entity_dict.get('start')
+            end_idx = entity_dict.get('end')
+            
+            if start_idx is None or end_idx is None:
+                logger.warning(f"Missing offsets for entity '{entity_dict['word']}' in chunk {chunk.chunk_index}")
+                continue
+            
+            # Sentencepiece offsets may include the leading space of a word
+            while start_idx < end_idx and chunk.text[start_idx].isspace():
+                start_idx += 1
+            while end_idx > start_idx and chunk.text[end_idx - 1].isspace():
+                end_idx -= 1
+            
+            if start_idx >= end_idx:
+                continue
+            
+            entities.append(self._make_entity(chunk, entity_dict, start_idx, end_idx))
+        
+        return entities
     
-    def detect_entities_in_chunk(self, chunk: ChunkWithPosition) -> List[Entity]:
-        """Detect entities in a chunk and return with global positions"""
-        if not self.pipeline:
-            raise RuntimeError("Model not loaded properly")
+    def _align_by_search(self, chunk: ChunkWithPosition, raw_entities: List[dict]) -> List[Entity]:
+        """Slow tokenizer fallback: locate each entity word in the chunk text"""
+        entities = []
+        search_from = 0
         
-        try:
-            raw_entities = self.pipeline(chunk.text)
-            entities = []
+        for entity_dict in raw_entities:
+            # Get the actual text span
+            entity_text = entity_dict['word']
             
-            for entity_dict in raw_entities:
-                # Get the actual text span
-                entity_text = entity_dict['word']
-                
-                # CRITICAL FIX: Find the actual character position in the chunk
-                # The entity_dict['start'] and entity_dict['end'] might be token-based
-                # We need to find the actual character positions
-                
-                # Try to find the entity text in the chunk
-                # Handle special characters that the tokenizer might have modified
-                clean_entity = entity_text.replace('##', '').replace('▁', '').strip()
-                
-                # Search for the entity in the chunk text
+            # CRITICAL FIX: Find the actual character position in the chunk
+            # The entity_dict['start'] and entity_dict['end'] might be token-based
+            # We need to find the actual character positions
+            
+            # Try to find the entity text in the chunk
+            # Handle special characters that the tokenizer might have modified
+            clean_entity = entity_text.replace('##', '').replace('▁', '').strip()
+            
+            # Search for the entity after the previous one, the pipeline
+            # returns entities in reading order
+            start_idx = chunk.text.find(clean_entity, search_from)
+            if start_idx == -1:
                 start_idx = chunk.text.find(clean_entity)
+            
+            # If not found, try with the original boundaries from the model
+            if start_idx == -1:
+                # Use model's provided positions as fallback
+                local_start = entity_dict.get('start')
+                local_end = entity_dict.get('end')
                 
-                # If not found, try with the original boundaries from the model
-                if start_idx == -1:
-                    # Use model's provided positions as fallback
-                    local_start = entity_dict.get('start', 0)
-                    local_end = entity_dict.get('end', len(chunk.text))
-                    
-                    # Validate these positions
-                    if local_start >= len(chunk.text):
-                        local_start = 0
-                    if local_end > len(chunk.text):
-                        local_end = len(chunk.text)
-                    
-                    # Extract text at these positions to verify
-                    extracted_text = chunk.text[local_start:local_end]
-                    
-                    # If extracted text is reasonable, use it
-                    if len(extracted_text) > 0 and len(extracted_text) < 200:
-                        start_idx = local_start
-                        clean_entity = extracted_text.strip()
-                    else:
-                        # Skip this entity if we can't locate it properly
-                        logger.warning(f"Could not locate entity '{entity_text}' in chunk {chunk.chunk_index}")
-                        continue
+                # Slow tokenizers give no offsets at all
+                if local_start is None or local_end is None:
+                    logger.warning(f"Could not locate entity '{entity_text}' in chunk {chunk.chunk_index}")
+                    continue
                 
-                # Calculate end position
-                end_idx = start_idx + len(clean_entity)
+                # Validate these positions
+                if local_start >= len(chunk.text):
+                    local_start = 0
+                if local_end > len(chunk.text):
+                    local_end = len(chunk.text)
                 
-                # Convert to global positions
-                global_start = chunk.start_offset + start_idx
-                global_end = chunk.start_offset + end_idx
+                # Extract text at these positions to verify
+                extracted_text = chunk.text[local_start:local_end]
                 
-                entity = Entity(
-                    text=clean_entity,
-                    entity_type=entity_dict.get('entity_group', 'UNKNOWN'),
-                    score=entity_dict.get('score', 0.0),
-                    start_pos=global_start,
-                    end_pos=global_end,
-                    chunk_index=chunk.chunk_index,
-                    model_source=self.__class__.__name__
-                )
-                entities.append(entity)
+                # If extracted text is reasonable, use it
+                if len(extracted_text) > 0 and len(extracted_text) < 200:
+                    start_idx = local_start
+                    clean_entity = extracted_text.strip()
+                else:
+                    # Skip this entity if we can't locate it properly
+                    logger.warning(f"Could not locate entity '{entity_text}' in chunk {chunk.chunk_index}")
+                    continue
+            
+            # Calculate end position
+            end_idx = start_idx + len(clean_entity)
+            search_from = end_idx
             
-            return entities
+            entities.append(self._make_entity(chunk, entity_dict, start_idx, end_idx))
+        
+        return entities
+    
+    def _postprocess_entities(self, entities: List[Entity]) -> List[Entity]:
+        """Hook for subclasses to map labels and drop unwanted entities"""
+        return entities
+    
+    def detect_entities_in_chunk(self, chunk: ChunkWithPosition) -> List[Entity]:
+        """Detect entities in a chunk and return with global positions"""
+        if not self.pipeline:
+            raise RuntimeError("Model not loaded properly")
+        
+        try:
+            raw_entities = self.pipeline(chunk.text)
+            return self._postprocess_entities(self._entities_from_raw(chunk, raw_entities))
         except Exception as e:
             logger.error(f"Error detecting entities in chunk {chunk.chunk_index}: {e}")
             import traceback
             traceback.print_exc()
             return []
+    
+    def _forward_logits(self, input_ids, attention_mask) -> np.ndarray:
+        """Token classification logits of a batch of windows"""
+        with torch.no_grad():
+            return self.model(input_ids=input_ids, attention_mask=attention_mask).logits.numpy()  # type: ignore
+    
+    def detect_entities_strided(self, chunk: ChunkWithPosition, max_length: int = 512, stride: int = 64,
+                                batch_size: int = 8) -> List[Entity]:
+        """
+        Detect entities in a text of any length with the tokenizer's overflowing windows
+        Windows share stride tokens, each token keeps the prediction of the window
+        where it is most central, so entities are aggregated once without duplicates
+        """
+        if not self.pipeline:
+            raise RuntimeError("Model not loaded properly")
+        
+        if not self.use_fast:
+            raise ValueError(f"Strided inference needs a fast tokenizer, {self.model_name} has none")
+        
+        encodings = self.tokenizer(  # type: ignore
+            chunk.text, max_length=max_length, stride=stride, truncation=True, padding=True,
+            return_overflowing_tokens=True, return_offsets_mapping=True,
+            return_special_tokens_mask=True, return_tensors="pt")
+        input_ids = encodings['input_ids']
+        attention_mask = encodings['attention_mask']
+        
+        logits = np.concatenate([
+            self._forward_logits(input_ids[i:i + batch_size], attention_mask[i:i + batch_size])
+            for i in range(0, len(input_ids), batch_size)
+        ])
+        # Same softmax as the token classification pipeline
+        shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        scores = shifted / shifted.sum(axis=-1, keepdims=True)
+        
+        # Overlapping windows hold the same tokens with the same offsets,
+        # keep for each token the window where it is furthest from an edge
+        best = {}  # (char start, char end, token id) -> (centrality, window, position)
+        ids = input_ids.tolist()
+        offsets = encodings['offset_mapping'].tolist()
+        special = encodings['special_tokens_mask'].tolist()
+        mask = attention_mask.tolist()
+        for window in range(len(ids)):
+            positions = [p for p in range(len(ids[window])) if mask[window][p] and not special[window][p]]
+            if not positions:
+                continue
+            first, last = positions[0], positions[-1]
+            for p in positions:
+                key = (offsets[window][p][0], offsets[window][p][1], ids[window][p])
+                centrality = min(p - first, last - p)
+                if key not in best or centrality > best[key][0]:
+                    best[key] = (centrality, window, p)
+        
+        if not best:
+            return []
+        
+        tokens = sorted(best)
+        token_ids = np.array([token_id for _, _, token_id in tokens])
+        token_scores = np.stack([scores[best[t][1], best[t][2]] for t in tokens])
+        offset_mapping = [(start, end) for start, end, _ in tokens]
+        
+        pre_entities = self.pipeline.gather_pre_entities(  # type: ignore
+            chunk.text, token_ids, token_scores, offset_mapping,
+            np.zeros(len(tokens), dtype=int), AggregationStrategy.SIMPLE)
+        # aggregate keeps the non-entity groups that the pipeline's postprocess drops
+        raw_entities = [
+            entity for entity in self.pipeline.aggregate(pre_entities, AggregationStrategy.SIMPLE)  # type: ignore
+            if entity.get('entity_group') not in IGNORE_LABELS
+        ]
+        
+        logger.info(f"{self.__class__.__name__}: {len(ids)} strided windows over {len(tokens)} tokens "
+                    f"in chunk {chunk.chunk_index}")
+        return self._postprocess_entities(self._entities_from_raw(chunk, raw_entities))
+    
+    def detect_entities_in_chunks(self, chunks: List[ChunkWithPosition], batch_size: int = 8,
+                                  stride: Optional[int] = None, max_length: int = 512) -> List[Entity]:
+        """
+        Detect entities in several chunks with batched forward passes
+        Chunks are sorted by token length so each batch carries little padding
+        With a stride, each chunk may be a whole document read in strided windows
+        """
+        if not self.pipeline:
+            raise RuntimeError("Model not loaded properly")
+        
+        if not chunks:
+            return []
+        
+        if stride is not None:
+            return [e for chunk in chunks
+                    for e in self.detect_entities_strided(chunk, max_length, stride, batch_size)]
+        
+        if batch_size <= 1 or len(chunks) == 1:
+            return [e for chunk in chunks for e in self.detect_entities_in_chunk(chunk)]
+        
+        # Group chunks of similar token length into the same batches
+        token_lengths = [len(ids) for ids in self.tokenizer([c.text for c in chunks])['input_ids']]  # type: ignore
+        ordered = sorted(range(len(chunks)), key=lambda i: token_lengths[i])
+        ordered_chunks = [chunks[i] for i in ordered]
+        
+        try:
+            raw_results = self.pipeline([c.text for c in ordered_chunks], batch_size=batch_size)
+        except Exception as e:
+            logger.error(f"Batched inference failed on {len(chunks)} chunks, falling back to per-chunk calls: {e}")
+            return [e for chunk in chunks for e in self.detect_entities_in_chunk(chunk)]
+        
+        entities = []
+        for chunk, raw_entities in zip(ordered_chunks, raw_results):
+            entities.extend(self._postprocess_entities(self._entities_from_raw(chunk, raw_entities)))
+        
+        # Restore document order
+        entities.sort(key=lambda e: (e.chunk_index, e.start_pos))
+        return entities
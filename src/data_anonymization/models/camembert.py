@@ -1,12 +1,14 @@
 from .base import PIIModel
-from ..core.entities import Entity, ChunkWithPosition
+from ..core.entities import Entity
 from typing import List
 
 class CamembertNERWithDatesModel(PIIModel):
     """Camembert NER model with date detection for French text"""
     
-    def __init__(self):
-        super().__init__("Jean-Baptiste/camembert-ner-with-dates")
+    MODEL_NAME = "Jean-Baptiste/camembert-ner-with-dates"
+    
+    def __init__(self, **kwargs):
+        super().__init__(self.MODEL_NAME, **kwargs)
         self.entity_mapping = {
             'PER': 'NAME',
             'LOC': 'LOCATION',
@@ -16,9 +18,7 @@ class CamembertNERWithDatesModel(PIIModel):
         }
         self.placeholder_tokens = ["ADDRESS", "LOCATION", "PHONE", "EMAIL", "DATE", "ID", "MISC", "NAME"]
     
-    def detect_entities_in_chunk(self, chunk: ChunkWithPosition) -> List[Entity]:
-        entities = super().detect_entities_in_chunk(chunk)
-        
+    def _postprocess_entities(self, entities: List[Entity]) -> List[Entity]:
         cleaned_entities = []
         for entity in entities:
             word = entity.text.upper()
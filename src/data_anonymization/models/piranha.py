@@ -5,8 +5,10 @@ from .base import PIIModel
 class PiranhaPIIModel(PIIModel):
     """Piranha model for PII detection"""
 
-    def __init__(self):
-        super().__init__("iiiorg/piiranha-v1-detect-personal-information")
+    MODEL_NAME = "iiiorg/piiranha-v1-detect-personal-information"
+
+    def __init__(self, **kwargs):
+        super().__init__(self.MODEL_NAME, **kwargs)
         self.entity_mapping = {
             'GIVENNAME': 'NAME',
             'SURNAME': 'NAME',
@@ -23,9 +25,7 @@ class PiranhaPIIModel(PIIModel):
             'COUNTRY': 'LOCATION'
         }
 
-    def detect_entities_in_chunk(self, chunk) -> List:
-        entities = super().detect_entities_in_chunk(chunk)
-
+    def _postprocess_entities(self, entities) -> List:
         for entity in entities:
             original_type = entity.entity_type
             entity.entity_type = self.entity_mapping.get(original_type, original_type)
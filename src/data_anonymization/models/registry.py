@@ -0,0 +1,147 @@
+import gc
+import inspect
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple, Type, Union
+
+from .base import PIIModel
+
+logger = logging.getLogger(__name__)
+
+ModelKey = Tuple[str, Tuple[Tuple[str, Any], ...]]
+ModelSpec = Union[Type[PIIModel], Tuple[Type[PIIModel], Dict[str, Any]]]
+
+
+class ModelRegistry:
+    """Process-wide pool of loaded PII models keyed by model class and config"""
+
+    def __init__(self):
+        self._models: Dict[ModelKey, PIIModel] = {}
+        self._lock = threading.Lock()
+        # One lock per key so that different models can load concurrently
+        # while two callers asking for the same model wait for a single load
+        self._load_locks: Dict[ModelKey, threading.Lock] = {}
+
+    @staticmethod
+    def _default_config(model_cls: Type[PIIModel]) -> Dict[str, Any]:
+        """Constructor defaults, subclasses forwarding **kwargs inherit PIIModel's"""
+        defaults = {}
+        signatures = [inspect.signature(model_cls.__init__)]
+        if any(p.kind is p.VAR_KEYWORD for p in signatures[0].parameters.values()):
+            signatures.append(inspect.signature(PIIModel.__init__))
+
+        for signature in reversed(signatures):
+            for name, param in signature.parameters.items():
+                if name not in ('self', 'model_name') and param.default is not param.empty:
+                    defaults[name] = param.default
+        return defaults
+
+    @classmethod
+    def make_key(cls, model_cls: Type[PIIModel], **config) -> ModelKey:
+        """
+        Build the registry key for a model class and its constructor config
+        Defaults are filled in so that get(M) and get(M, use_fast=True) share a model
+        """
+        full_config = {**cls._default_config(model_cls), **config}
+        return (
+            f"{model_cls.__module__}.{model_cls.__qualname__}",
+            tuple(sorted(full_config.items()))
+        )
+
+    def get(self, model_cls: Type[PIIModel], **config) -> PIIModel:
+        """Return the shared model instance, loading it on first use"""
+        key = self.make_key(model_cls, **config)
+
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Another thread may have finished loading while we waited
+            model = self._models.get(key)
+            if model is None:
+                logger.info(f"Registry miss, loading {key[0]} with config {dict(key[1])}")
+                model = model_cls(**config)
+                with self._lock:
+                    self._models[key] = model
+
+        return model
+
+    def warm_up(self, *specs: ModelSpec) -> None:
+        """Load the given models ahead of the first request"""
+        for spec in specs:
+            if isinstance(spec, tuple):
+                model_cls, config = spec
+            else:
+                model_cls, config = spec, {}
+            self.get(model_cls, **config)
+
+    def is_loaded(self, model_cls: Type[PIIModel], **config) -> bool:
+        return self.make_key(model_cls, **config) in self._models
+
+    def evict(self, model_cls: Type[PIIModel], **config) -> bool:
+        """Drop a model from the pool, returns True if it was loaded"""
+        key = self.make_key(model_cls, **config)
+        with self._lock:
+            model = self._models.pop(key, None)
+            self._load_locks.pop(key, None)
+
+        if model is None:
+            return False
+
+        del model
+        gc.collect()
+        logger.info(f"Evicted model {key[0]} with config {dict(key[1])}")
+        return True
+
+    def clear(self) -> None:
+        """Drop every loaded model"""
+        with self._lock:
+            self._models.clear()
+            self._load_locks.clear()
+        gc.collect()
+        logger.info("Model registry cleared")
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Report the parameter memory held by each loaded model"""
+        with self._lock:
+            items = list(self._models.items())
+
+        models = []
+        total_bytes = 0
+        for (class_path, config), model in items:
+            size = model.memory_footprint()
+            total_bytes += size
+            models.append({
+                'model_class': class_path,
+                'model_name': model.model_name,
+                'config': dict(config),
+                'memory_mb': round(size / (1024 ** 2), 1)
+            })
+
+        return {
+            'loaded_models': len(models),
+            'total_memory_mb': round(total_bytes / (1024 ** 2), 1),
+            'models': models
+        }
+
+
+_default_registry = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Return the process-wide model registry"""
+    return _default_registry
+
+
+def load_models(specs: Dict[str, Tuple[Type[PIIModel], Dict[str, Any]]],
+                registry: Optional[ModelRegistry] = None) -> Dict[str, PIIModel]:
+    """
+    Resolve {key: (model class, config)} specs through a registry
+    Picklable with functools.partial, so process workers can load their own models
+    """
+    registry = registry or get_model_registry()
+    return {key: registry.get(model_cls, **config) for key, (model_cls, config) in specs.items()}
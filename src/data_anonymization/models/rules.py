@@ -0,0 +1,60 @@
+import logging
+import re
+from typing import List, Tuple
+from ..core.entities import Entity, ChunkWithPosition
+
+logger = logging.getLogger(__name__)
+
+_MONTHS = r"janvier|f[ée]vrier|mars|avril|mai|juin|juillet|ao[ûu]t|septembre|octobre|novembre|d[ée]cembre"
+
+# (entity type, pattern), compiled once at import
+_RULES: List[Tuple[str, re.Pattern]] = [
+    ('EMAIL', re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")),
+    # 0X XX XX XX XX or +33 X XX XX XX XX, with spaces, dots or dashes
+    ('PHONE', re.compile(r"(?<![\d+])(?:(?:\+|00)33\s?|0)[1-9](?:[\s.-]?\d{2}){4}(?!\d)")),
+    # NIR: sex, birth year and month, department, commune, order number, optional key
+    ('ID', re.compile(r"(?<!\d)[12]\s?\d{2}\s?(?:0[1-9]|1[0-2]|[2-9]\d)\s?(?:\d{2}|2[AB])\s?\d{3}\s?\d{3}(?:\s?\d{2})?(?!\d)")),
+    # Postal codes only next to a city name or in parentheses, bare 5-digit numbers are too common
+    ('ADDRESS', re.compile(r"(?<=\()(?:0[1-9]|[1-8]\d|9[0-8])\d{3}(?=\))"
+                           r"|(?<!\d)(?:0[1-9]|[1-8]\d|9[0-8])\d{3}(?=\s+[A-ZÉÈ][a-zéèêàâîôûç-]+)")),
+    ('DATE', re.compile(r"(?<!\d)(?:0?[1-9]|[12]\d|3[01])[/.-](?:0?[1-9]|1[0-2])[/.-](?:19|20)\d{2}(?!\d)"
+                        rf"|\b(?:1er|0?[1-9]|[12]\d|3[01])\s+(?:{_MONTHS})\s+(?:19|20)\d{{2}}\b", re.IGNORECASE)),
+]
+
+# Digits, '@' or any capitalized word: anything else cannot hold PII. Sentence-initial
+# capitals count too, a name can open a sentence or follow ':' or '('
+_CANDIDATE_SCAN = re.compile(r"[\d@]|\b[A-ZÀ-ÖØ-Þ]\w")
+
+
+class RuleBasedPIIDetector:
+    """Precompiled regex detector for structured French PII: phones, emails, NIR, postal codes, dates"""
+
+    SOURCE = "Rules"
+
+    @staticmethod
+    def has_candidates(text: str) -> bool:
+        """Cheap scan telling whether the models could find anything in the text"""
+        return _CANDIDATE_SCAN.search(text) is not None
+
+    def detect_entities_in_chunk(self, chunk: ChunkWithPosition) -> List[Entity]:
+        """Detect entities in a chunk and return with global positions"""
+        entities = []
+        for entity_type, pattern in _RULES:
+            for match in pattern.finditer(chunk.text):
+                entities.append(Entity(
+                    text=match.group(),
+                    entity_type=entity_type,
+                    score=1.0,
+                    start_pos=chunk.start_offset + match.start(),
+                    end_pos=chunk.start_offset + match.end(),
+                    chunk_index=chunk.chunk_index,
+                    model_source=self.SOURCE
+                ))
+        return entities
+
+    def detect_entities_in_chunks(self, chunks: List[ChunkWithPosition]) -> List[Entity]:
+        """Detect entities in several chunks, in document order"""
+        entities = [e for chunk in chunks for e in self.detect_entities_in_chunk(chunk)]
+        entities.sort(key=lambda e: (e.chunk_index, e.start_pos))
+        logger.info(f"Rules: {len(entities)} entities in {len(chunks)} chunks")
+        return entities
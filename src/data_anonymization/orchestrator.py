@@ -1,12 +1,22 @@
+import asyncio
 import logging
-from typing import List, Dict, Any
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, Union
 from collections import defaultdict
-from langchain_core.runnables import RunnableParallel, RunnableLambda
 
+from .core.cascade import CascadePolicy
 from .core.entities import ChunkWithPosition, Entity
+from .core.entity_cache import EntityCache, get_entity_cache, resolve_repeats, split_cached, store_results
+from .core.execution import create_execution_backend
+from .core.text_diff import edit_bounds
 from .core.text_splitter import PositionAwareTextSplitter
+from .models.base import PIIModel, load_fast_tokenizer
 from .models.piranha import PiranhaPIIModel
 from .models.camembert import CamembertNERWithDatesModel
+from .models.rules import RuleBasedPIIDetector
+from .models.registry import ModelRegistry, get_model_registry, load_models
 from .processors.entity_merger import EntityMerger
 from .processors.text_anonymizer import TextAnonymizer
 
@@ -19,34 +29,233 @@ class MedicalTextAnonymizer:
     def __init__(self,
                  chunk_size: int = 500,
                  chunk_overlap: int = 100,
-                 confidence_threshold: float = 0.5):
+                 confidence_threshold: float = 0.5,
+                 model_registry: Optional[ModelRegistry] = None,
+                 batch_size: int = 8,
+                 model_options: Optional[Dict[str, Dict[str, Any]]] = None,
+                 execution_backend: str = "threads",
+                 num_workers: Optional[int] = None,
+                 chunking: str = "chars",
+                 max_tokens: int = 510,
+                 stride: int = 64,
+                 entity_cache: Optional[EntityCache] = None,
+                 use_entity_cache: bool = True,
+                 use_rules: bool = True,
+                 skip_chunks_without_candidates: bool = False,
+                 cascade: Optional[CascadePolicy] = None,
+                 async_concurrency: int = 2,
+                 limit_torch_threads: bool = False):
+        """
+        Args:
+            model_options: Per-model PIIModel options keyed by 'piranha' or 'camembert',
+                e.g. {'camembert': {'use_fast': False}} for the slow tokenizer alignment
+                or {'piranha': {'backend': 'onnx'}} to run it with ONNX Runtime and
+                {'piranha': {'quantize': True}} for dynamic int8 quantization
+            execution_backend: 'serial', 'threads' (torch threads split between workers),
+                'processes' (each worker process holds its own models) or 'prefork'
+                (workers forked after the models are loaded share their weights, Linux/macOS)
+            num_workers: Number of threads or processes, defaults to 2
+            chunking: 'chars' splits on chunk_size characters, 'tokens' fills chunks
+                up to max_tokens tokens of both models' tokenizers, 'strided' lets each
+                model read the whole text in tokenizer windows of max_tokens tokens
+            max_tokens: Token budget per chunk, also the limit used to report
+                truncated chunks in 'chars' mode
+            stride: Tokens shared by consecutive windows in 'strided' mode
+            entity_cache: Cache of model entities per chunk text, defaults to the
+                process-wide cache
+            use_entity_cache: Run every chunk through the models when False
+            use_rules: Add the regex detector for phones, emails, NIR, postal codes and dates
+            skip_chunks_without_candidates: Do not run the models on chunks without
+                digits, '@' or capitalized words
+            cascade: Run the policy's second model only on the chunks where the
+                first one is not conclusive, both models read every chunk when None.
+                Without use_rules, chunks with digits or '@' always reach the second model
+            async_concurrency: Texts anonymized at once by aanonymize_text and
+                aanonymize_many, further calls wait on the event loop
+            limit_torch_threads: Split the cores between the 'threads' workers with
+                torch.set_num_threads, which applies to the whole process
+        """
 
         logger.info("Initializing Medical Text Anonymizer...")
 
+        # Models are shared process-wide, only the first anonymizer pays for loading
+        self.model_registry = model_registry or get_model_registry()
+        self.model_options = model_options or {}
+        self._model_specs = {
+            'piranha': (PiranhaPIIModel, self.model_options.get('piranha', {})),
+            'camembert': (CamembertNERWithDatesModel, self.model_options.get('camembert', {})),
+        }
+        # Cache identity of each model: class, name and full config including the revision
+        self._model_ids = {
+            key: repr(ModelRegistry.make_key(model_cls, **config))
+            for key, (model_cls, config) in self._model_specs.items()
+        }
+        self.entity_cache = (entity_cache or get_entity_cache()) if use_entity_cache else None
+        self.rule_detector = RuleBasedPIIDetector() if use_rules else None
+        self.skip_chunks_without_candidates = skip_chunks_without_candidates
+
+        if cascade is not None and {cascade.first, cascade.second} != set(self._model_specs):
+            raise ValueError(f"Cascade models must be {sorted(self._model_specs)}, "
+                             f"got '{cascade.first}' then '{cascade.second}'")
+        self.cascade = cascade
+
+        # Spawned workers load their own models, in-process and forked workers use the parent's
+        if execution_backend == "processes":
+            model_factory = partial(load_models, self._model_specs)
+        else:
+            model_factory = partial(load_models, self._model_specs, self.model_registry)
+            model_factory()
+
         self.text_splitter = PositionAwareTextSplitter(
             chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap
+            chunk_overlap=chunk_overlap,
+            tokenizers=self._load_tokenizers(execution_backend),
+            max_tokens=max_tokens,
+            # Strided windows are cut by the tokenizers, the splitter is not used
+            chunking="chars" if chunking == "strided" else chunking
+        )
+        self.chunking = chunking
+        self.max_tokens = max_tokens
+        self.stride = stride
+
+        self.executor = create_execution_backend(
+            execution_backend,
+            model_factory,
+            num_workers=num_workers,
+            batch_size=batch_size,
+            limit_torch_threads=limit_torch_threads
         )
 
-        self.piranha_model = PiranhaPIIModel()
-        self.camembert_model = CamembertNERWithDatesModel()
         self.entity_merger = EntityMerger()
         self.anonymizer = TextAnonymizer()
         self.confidence_threshold = confidence_threshold
+        self.batch_size = batch_size
+
+        # Async calls run anonymize_text on their own bounded pool, started on first use
+        self.async_concurrency = async_concurrency
+        self._async_executor: Optional[ThreadPoolExecutor] = None
+        self._async_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
 
         logger.info("Medical Text Anonymizer initialized successfully")
 
-    def _process_chunk_with_both_models(self, chunk: ChunkWithPosition) -> List[Entity]:
-        """Process a single chunk with both models in parallel"""
-        entities_piranha = self.piranha_model.detect_entities_in_chunk(chunk)
-        entities_camembert = self.camembert_model.detect_entities_in_chunk(
-            chunk)
+    @property
+    def piranha_model(self) -> PIIModel:
+        return self.model_registry.get(PiranhaPIIModel, **self._model_specs['piranha'][1])
+
+    @property
+    def camembert_model(self) -> PIIModel:
+        return self.model_registry.get(CamembertNERWithDatesModel, **self._model_specs['camembert'][1])
+
+    def _load_tokenizers(self, execution_backend: str) -> List[Any]:
+        """Tokenizers of both models, loaded on their own when the models live in workers"""
+        if execution_backend == "processes":
+            tokenizers = [load_fast_tokenizer(model_cls.MODEL_NAME, config.get('revision'))
+                          for model_cls, config in self._model_specs.values()]
+        else:
+            tokenizers = [self.piranha_model.tokenizer, self.camembert_model.tokenizer]
+        return [t for t in tokenizers if t is not None]
+
+    def close(self) -> None:
+        """Stop the execution backend workers"""
+        self.executor.shutdown()
+        if self._async_executor is not None:
+            self._async_executor.shutdown()
+            self._async_executor = None
+
+    def _split(self, text: str) -> Tuple[List[ChunkWithPosition], Dict[str, Any]]:
+        """Chunks to run the models on, the whole text in 'strided' mode"""
+        if self.chunking != "strided":
+            return self.text_splitter.split_text_with_stats(text)
+
+        chunks = [ChunkWithPosition(text=text, start_offset=0, end_offset=len(text), chunk_index=0)] if text else []
+        return chunks, {
+            'mode': 'strided',
+            'chunks': len(chunks),
+            'chars': len(text),
+            'max_tokens': self.max_tokens,
+            'stride': self.stride,
+            'truncated_chunks': 0,
+            'tokenizers': {}
+        }
 
-        all_entities = entities_piranha + entities_camembert
-        logger.info(
-            f"Chunk {chunk.chunk_index}: Found {len(entities_piranha)} (Piranha) + {len(entities_camembert)} (CamemBERT) = {len(all_entities)} entities")
+    def _inference_options(self) -> Dict[str, Any]:
+        """Options forwarded to PIIModel.detect_entities_in_chunks"""
+        if self.chunking == "strided":
+            # Windows hold max_tokens content tokens plus the special tokens
+            return {'stride': self.stride, 'max_length': self.max_tokens + 2}
+        return {}
+
+    def _run_models(self, model_chunks: Dict[str, List[ChunkWithPosition]]) -> Tuple[Dict[str, List[Entity]], int, int]:
+        """
+        Entities of each model over its chunks, chunks found in the entity cache
+        are served from it and only the others go to the execution backend
+        Returns the entities by model key, the cache hits and the cache lookups
+        """
+        model_keys = list(model_chunks)
+        if self.entity_cache is None:
+            results = self.executor.run([(key, model_chunks[key]) for key in model_keys], **self._inference_options())
+            return dict(zip(model_keys, results)), 0, 0
+
+        cached = {}
+        missing = {}
+        repeats = {}
+        # Entities found with other inference settings are not reused
+        cache_options = {'chunking': self.chunking, **self._inference_options()}
+        for key in model_keys:
+            cached[key], missing[key], repeats[key] = split_cached(
+                self.entity_cache, model_chunks[key], self._model_ids[key],
+                self._model_specs[key][1].get('revision'), self.confidence_threshold, cache_options)
+
+        results = self.executor.run(
+            [(key, [chunk for _, chunk in missing[key]]) for key in model_keys], **self._inference_options())
+
+        entities = {}
+        for key, found in zip(model_keys, results):
+            stored = store_results(self.entity_cache, missing[key], found)
+            cached[key].extend(resolve_repeats(repeats[key], stored))
+            entities[key] = sorted(cached[key] + found, key=lambda e: (e.chunk_index, e.start_pos))
+
+        lookups = sum(len(chunks) for chunks in model_chunks.values())
+        hits = lookups - sum(len(m) for m in missing.values())
+        return entities, hits, lookups
+
+    def _detect(self, chunks: List[ChunkWithPosition]) -> Tuple[Dict[str, List[Entity]], Dict[str, Any], Dict[str, Any]]:
+        """Entities of each model over the chunks, with the cache and cascade statistics"""
+        if self.cascade is None:
+            entities, hits, lookups = self._run_models({key: chunks for key in self._model_specs})
+            cascade_stats: Dict[str, Any] = {'enabled': False}
+        else:
+            first, second = self.cascade.first, self.cascade.second
+            entities, hits, lookups = self._run_models({first: chunks})
+
+            # Without the regex rules, contact details are left to the second model
+            second_chunks = self.cascade.select(chunks, entities[first], escalate_contacts=self.rule_detector is None)
+            second_entities, second_hits, second_lookups = self._run_models({second: second_chunks})
+            entities.update(second_entities)
+            hits += second_hits
+            lookups += second_lookups
+
+            cascade_stats = {
+                'enabled': True,
+                'first': first,
+                'second': second,
+                'second_model_chunks': len(second_chunks),
+                'model_calls_saved': len(chunks) - len(second_chunks)
+            }
+            logger.info(f"Cascade: {second} ran on {len(second_chunks)}/{len(chunks)} chunks")
+
+        if self.entity_cache is None:
+            return entities, {'enabled': False}, cascade_stats
 
-        return all_entities  # type: ignore
+        logger.info(f"Entity cache: {hits}/{lookups} chunk lookups served from cache")
+        cache_stats = {
+            'enabled': True,
+            'hits': hits,
+            'misses': lookups - hits,
+            'hit_rate': round(hits / lookups, 3) if lookups else 0.0
+        }
+        return entities, cache_stats, cascade_stats
 
     def anonymize_text(self, text: str) -> Dict[str, Any]:
         """
@@ -61,40 +270,164 @@ class MedicalTextAnonymizer:
         logger.info(f"Starting anonymization of text ({len(text)} chars)")
 
         # Step 1: Split text into chunks with positions
-        chunks = self.text_splitter.split_text_with_positions(text)
+        chunks, chunking_stats = self._split(text)
 
-        # Step 2: Create parallel processing chain
-        chunk_processors = {
-            f"chunk_{chunk.chunk_index}": RunnableLambda(
-                lambda _input, chunk=chunk: self._process_chunk_with_both_models(
-                    chunk)  # type: ignore
-            )
-            for chunk in chunks
-        }
+        # Step 2-5: Detect and merge entities
+        merged_entities, detection_stats = self._find_entities(chunks)
 
-        parallel_chain = RunnableParallel(**chunk_processors)  # type: ignore
+        # Step 6-7: Anonymize text in a single pass and prepare metadata
+        return self._build_result(text, merged_entities, {
+            'chunks_processed': len(chunks),
+            'chunking': chunking_stats,
+            'execution_backend': self.executor.name,
+            **detection_stats
+        })
 
-        # Step 3: Execute parallel processing
-        logger.info(f"Processing {len(chunks)} chunks in parallel...")
-        results = parallel_chain.invoke({})
+    def anonymize_texts(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Anonymize several documents with shared batched forward passes
 
-        # Step 4: Flatten all entities
-        all_entities = []
-        for chunk_result in results.values():
-            all_entities.extend(chunk_result)
+        Chunks of all documents go through the models together, entities are
+        then merged per document. Results are those of anonymize_text, except
+        that cache, cascade and rules statistics cover the whole batch.
+        """
+        logger.info(f"Starting anonymization of {len(texts)} texts ({sum(len(t) for t in texts)} chars)")
+
+        # Chunk indices are made unique across documents to route entities back
+        splits = [self._split(text) for text in texts]
+        chunks: List[ChunkWithPosition] = []
+        owners: List[Tuple[int, int]] = []  # batch chunk index -> (document, chunk index in the document)
+        for doc_index, (doc_chunks, _) in enumerate(splits):
+            for chunk in doc_chunks:
+                owners.append((doc_index, chunk.chunk_index))
+                chunks.append(ChunkWithPosition(text=chunk.text, start_offset=chunk.start_offset,
+                                                end_offset=chunk.end_offset, chunk_index=len(chunks)))
+
+        all_entities, detection_stats = self._collect_entities(chunks)
+
+        doc_entities: List[List[Entity]] = [[] for _ in texts]
+        for entity in all_entities:
+            doc_index, entity.chunk_index = owners[entity.chunk_index]
+            doc_entities[doc_index].append(entity)
+
+        results = []
+        for text, (doc_chunks, chunking_stats), entities in zip(texts, splits, doc_entities):
+            merged_entities = self.entity_merger.merge_entities(entities, confidence_threshold=self.confidence_threshold)
+            results.append(self._build_result(text, merged_entities, {
+                'chunks_processed': len(doc_chunks),
+                'chunking': chunking_stats,
+                'execution_backend': self.executor.name,
+                **detection_stats
+            }))
+        return results
+
+    def _async_slot(self) -> asyncio.Semaphore:
+        """Semaphore of the running event loop, semaphores cannot be shared between loops"""
+        loop = asyncio.get_running_loop()
+        slot = self._async_slots.get(loop)
+        if slot is None:
+            slot = self._async_slots[loop] = asyncio.Semaphore(self.async_concurrency)
+        return slot
+
+    async def aanonymize_text(self, text: str) -> Dict[str, Any]:
+        """
+        Coroutine version of anonymize_text, inference runs on a bounded thread pool
 
-        logger.info(f"Total entities detected: {len(all_entities)}")
+        At most async_concurrency texts are in the pool, further callers wait on
+        the semaphore without queueing work, so the event loop keeps serving
+        other coroutines (LLM extraction calls) and cancelled callers cost nothing.
+        """
+        if self._async_executor is None:
+            self._async_executor = ThreadPoolExecutor(max_workers=self.async_concurrency,
+                                                      thread_name_prefix="anonymizer")
+        async with self._async_slot():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._async_executor, self.anonymize_text, text)
+
+    async def aanonymize_many(self, texts: Iterable[str]) -> List[Dict[str, Any]]:
+        """Anonymize several texts concurrently within async_concurrency, results in input order"""
+        return list(await asyncio.gather(*(self.aanonymize_text(text) for text in texts)))
+
+    def anonymize_incremental(self, previous_result: Dict[str, Any], text: str) -> Dict[str, Any]:
+        """
+        Re-anonymize an edited document, re-running detection only around the edit
 
-        # Step 5: Merge overlapping entities
-        merged_entities = self.entity_merger.merge_entities(
-            all_entities,
-            confidence_threshold=self.confidence_threshold
-        )
+        The single edit between the previous text and the new one is located by
+        common prefix and suffix. Previous entities that do not touch it are kept
+        and shifted, a window of one chunk around it is re-chunked and re-detected,
+        then both sets are merged again. Cost scales with the edit, not the document.
 
-        # Step 6: Anonymize text
-        anonymized_text = self.anonymizer.anonymize(text, merged_entities)
+        Args:
+            previous_result: Result of anonymize_text (or of this method) for the previous text
+            text: New version of the text
+
+        Returns:
+            Same dictionary as anonymize_text, statistics['incremental'] describes the re-detected window.
+            An unchanged text returns previous_result itself
+        """
+        previous_text = previous_result['original_text']
+        if previous_text == text:
+            return previous_result
+
+        edit_start, old_edit_end, new_edit_end = edit_bounds(previous_text, text)
+        shift = new_edit_end - old_edit_end
+
+        # Re-detect one chunk of context on both sides, cut at whitespace
+        window_start = max(0, edit_start - self.text_splitter._chunk_size)
+        while window_start > 0 and not text[window_start - 1].isspace():
+            window_start -= 1
+        window_end = min(len(text), new_edit_end + self.text_splitter._chunk_size)
+        while window_end < len(text) and not text[window_end].isspace():
+            window_end += 1
+
+        # Entities that do not touch the edit are kept, those inside the window are
+        # detected again and deduplicated by the merge
+        kept = []
+        for e in previous_result['entities']:
+            if e['end'] <= edit_start:
+                start, end = e['start'], e['end']
+            elif e['start'] >= old_edit_end:
+                start, end = e['start'] + shift, e['end'] + shift
+            else:
+                continue
+            kept.append(Entity(text=e['text'], entity_type=e['type'], score=e['score'],
+                               start_pos=start, end_pos=end, model_source=e['model']))
+
+        chunks: List[ChunkWithPosition] = []
+        detection_stats: Dict[str, Any] = {}
+        found: List[Entity] = []
+        if window_start < window_end:
+            window_chunks, _ = self._split(text[window_start:window_end])
+            chunks = [
+                ChunkWithPosition(text=c.text, start_offset=c.start_offset + window_start,
+                                  end_offset=c.end_offset + window_start, chunk_index=c.chunk_index)
+                for c in window_chunks
+            ]
+            found, detection_stats = self._find_entities(chunks)
+
+        # Entities cut by the window edges lose against the longer kept ones
+        merged_entities = self.entity_merger.merge_entities(kept + found, confidence_threshold=self.confidence_threshold)
+
+        logger.info(f"Incremental update: edit {edit_start}-{new_edit_end}, re-detected "
+                    f"{window_end - window_start if chunks else 0} of {len(text)} chars, kept {len(kept)} entities")
+        return self._build_result(text, merged_entities, {
+            'chunks_processed': len(chunks),
+            'execution_backend': self.executor.name,
+            **detection_stats,
+            'incremental': {
+                'edit_start': edit_start,
+                'edit_end': new_edit_end,
+                'window_start': window_start if chunks else None,
+                'window_end': window_end if chunks else None,
+                'redetected_chars': window_end - window_start if chunks else 0,
+                'kept_entities': len(kept)
+            }
+        })
+
+    def _build_result(self, text: str, merged_entities: List[Entity], statistics: Dict[str, Any]) -> Dict[str, Any]:
+        """Anonymize text in a single pass, keeping the offset map, and gather metadata"""
+        anonymized_text, offset_map = self.anonymizer.anonymize_with_offsets(text, merged_entities)
 
-        # Step 7: Prepare metadata
         entity_stats = defaultdict(int)
         for entity in merged_entities:
             entity_stats[entity.entity_type] += 1
@@ -102,27 +435,165 @@ class MedicalTextAnonymizer:
         return {
             'original_text': text,
             'anonymized_text': anonymized_text,
-            'entities': [
-                {
-                    'text': e.text,
-                    'type': e.entity_type,
-                    'start': e.start_pos,
-                    'end': e.end_pos,
-                    'score': e.score,
-                    'model': e.model_source
-                }
-                for e in merged_entities
-            ],
+            'entities': self._entity_dicts(merged_entities),
+            'offset_map': offset_map.to_list(),
             'statistics': {
                 'total_entities': len(merged_entities),
                 'entity_counts': dict(entity_stats),
-                'chunks_processed': len(chunks)
+                **statistics
             }
         }
 
+    @staticmethod
+    def _entity_dicts(entities: List[Entity]) -> List[Dict[str, Any]]:
+        return [
+            {
+                'text': e.text,
+                'type': e.entity_type,
+                'start': e.start_pos,
+                'end': e.end_pos,
+                'score': e.score,
+                'model': e.model_source
+            }
+            for e in entities
+        ]
+
+    def _collect_entities(self, chunks: List[ChunkWithPosition]) -> Tuple[List[Entity], Dict[str, Any]]:
+        """Rules and models over the chunks, returns unmerged entities and detection statistics"""
+        # Step 2: Rule-based pre-pass for structured PII, cheap and exact
+        entities_rules = self.rule_detector.detect_entities_in_chunks(chunks) if self.rule_detector else []
+
+        model_chunks = chunks
+        if self.skip_chunks_without_candidates:
+            model_chunks = [c for c in chunks if RuleBasedPIIDetector.has_candidates(c.text)]
+            logger.info(f"Skipping models on {len(chunks) - len(model_chunks)} chunks without candidates")
+
+        # Step 3: Run each model over the uncached chunks with batched forward
+        # passes on the configured execution backend
+        logger.info(f"Processing {len(model_chunks)} chunks on the {self.executor.name} backend...")
+        model_entities, cache_stats, cascade_stats = self._detect(model_chunks)
+        entities_piranha = model_entities['piranha']
+        entities_camembert = model_entities['camembert']
 
+        # Step 4: Flatten all entities
+        all_entities = entities_rules + entities_piranha + entities_camembert
+        logger.info(
+            f"Found {len(entities_rules)} (Rules) + {len(entities_piranha)} (Piranha) + "
+            f"{len(entities_camembert)} (CamemBERT) entities")
+
+        logger.info(f"Total entities detected: {len(all_entities)}")
+
+        return all_entities, {
+            'cache': cache_stats,
+            'cascade': cascade_stats,
+            'rules': {
+                'enabled': self.rule_detector is not None,
+                'entities': len(entities_rules),
+                'skipped_chunks': len(chunks) - len(model_chunks)
+            }
+        }
+
+    def _find_entities(self, chunks: List[ChunkWithPosition]) -> Tuple[List[Entity], Dict[str, Any]]:
+        """Rules, models and merge over the chunks, returns merged entities and detection statistics"""
+        all_entities, detection_stats = self._collect_entities(chunks)
+
+        # Step 5: Merge overlapping entities
+        merged_entities = self.entity_merger.merge_entities(
+            all_entities,
+            confidence_threshold=self.confidence_threshold
+        )
+        return merged_entities, detection_stats
+
+    def _safe_boundary(self, buffer: str, chunks: List[ChunkWithPosition], entities: List[Entity]) -> int:
+        """
+        End of the buffer prefix that later text cannot change: the start of the
+        last chunk, which may be cut by the buffer end, moved before any entity crossing it
+        """
+        if self.chunking == "strided":
+            safe = max(0, len(buffer) - self.text_splitter._chunk_size)
+        else:
+            safe = chunks[-1].start_offset if chunks else 0
+
+        for entity in sorted(entities, key=lambda e: e.start_pos, reverse=True):
+            if entity.start_pos < safe < entity.end_pos:
+                safe = entity.start_pos
+        return safe
+
+    def anonymize_stream(self, text_or_iterable: Union[str, Iterable[str]],
+                         window_chars: int = 10000) -> Iterator[Dict[str, Any]]:
+        """
+        Anonymize a long document piece by piece, yielding finalized segments
+
+        Text is buffered up to window_chars, the buffer prefix that no later chunk
+        overlap can affect is anonymized and yielded, the rest is carried over,
+        so about one window is held in memory. Chunks are cut relative to each
+        buffer, entities near a chunk boundary may differ from anonymize_text.
+
+        Args:
+            text_or_iterable: The whole text, or an iterator of text pieces such as PDF pages
+            window_chars: Characters buffered before a segment is finalized
+
+        Yields:
+            Dictionaries with the segment's original start and end, its anonymized
+            text and its entities with positions in the whole document
+        """
+        if isinstance(text_or_iterable, str):
+            text = text_or_iterable
+            piece_chars = window_chars
+            pieces: Iterable[str] = (text[i:i + piece_chars] for i in range(0, len(text), piece_chars))
+        else:
+            pieces = text_or_iterable
+
+        # Grows when no chunk of the buffer is final yet, the pieces keep their size
+        buffer_chars = window_chars
+        buffer = ""
+        buffer_offset = 0  # Position of the buffer in the whole document
+        segment_index = 0
+        pieces_iter = iter(pieces)
+        finished = False
+
+        while not finished:
+            # Fill the buffer up to the window, or with everything left
+            while len(buffer) < buffer_chars:
+                piece = next(pieces_iter, None)
+                if piece is None:
+                    finished = True
+                    break
+                buffer += piece
+
+            if not buffer:
+                break
+
+            chunks, _ = self._split(buffer)
+            entities, _ = self._find_entities(chunks)
+            safe = len(buffer) if finished else self._safe_boundary(buffer, chunks, entities)
+            if safe == 0:
+                # Not a single chunk is final yet, read more text first
+                buffer_chars += window_chars
+                continue
+
+            final_entities = [e for e in entities if e.end_pos <= safe]
+            anonymized_text, _ = self.anonymizer.anonymize_with_offsets(buffer[:safe], final_entities)
+            for entity in final_entities:
+                entity.start_pos += buffer_offset
+                entity.end_pos += buffer_offset
+
+            yield {
+                'segment_index': segment_index,
+                'start': buffer_offset,
+                'end': buffer_offset + safe,
+                'anonymized_text': anonymized_text,
+                'entities': self._entity_dicts(final_entities)
+            }
+            logger.info(f"Stream segment {segment_index}: chars {buffer_offset}-{buffer_offset + safe}, "
+                        f"{len(final_entities)} entities")
+
+            segment_index += 1
+            buffer = buffer[safe:]
+            buffer_offset += safe
+
+    @staticmethod
     def display_results(
-        self,
         results: Dict[str, Any],
         show_dectected_entities: bool = False,
         stat: bool = False
@@ -153,6 +624,22 @@ class MedicalTextAnonymizer:
             lines.append(
                 f"Chunks processed: {results['statistics']['chunks_processed']}"
             )
+            chunking = results['statistics'].get('chunking')
+            if chunking and chunking['tokenizers']:
+                lines.append(
+                    f"Chunks over the {chunking['max_tokens']} token budget: {chunking['truncated_chunks']}"
+                )
+            cache = results['statistics'].get('cache')
+            if cache and cache['enabled']:
+                lines.append(
+                    f"Entity cache: {cache['hits']} hits, {cache['misses']} misses ({cache['hit_rate']:.0%})"
+                )
+            rules = results['statistics'].get('rules')
+            if rules and rules['skipped_chunks']:
+                lines.append(f"Chunks without candidates (models skipped): {rules['skipped_chunks']}")
+            cascade = results['statistics'].get('cascade')
+            if cascade and cascade['enabled']:
+                lines.append(f"Cascade model calls saved: {cascade['model_calls_saved']}")
             lines.append("\nEntity counts by type:")
             for entity_type, count in results["statistics"]["entity_counts"].items():
                 lines.append(f"  {entity_type}: {count}")
@@ -7,7 +7,14 @@ logger = logging.getLogger(__name__)
 
 class EntityMerger:
     """Merges entities from multiple sources and handles overlaps"""
-    
+
+    @staticmethod
+    def _wins_over(candidate: Entity, current: Entity) -> bool:
+        """Longest span wins, the highest confidence breaks ties"""
+        candidate_len = candidate.end_pos - candidate.start_pos
+        current_len = current.end_pos - current.start_pos
+        return candidate_len > current_len or (candidate_len == current_len and candidate.score > current.score)
+
     @staticmethod
     def merge_entities(entities: List[Entity], confidence_threshold: float = 0.5) -> List[Entity]:
         """
@@ -15,62 +22,32 @@ class EntityMerger:
         - Remove duplicates from overlapping chunks
         - Resolve conflicts (prefer longer spans, higher confidence)
         - Filter by confidence threshold
+
+        Single sweep over entities sorted by start position: O(n log n) for the
+        sort, then each entity is compared once with the current winner
         """
         # Filter by confidence
         filtered = [e for e in entities if e.score >= confidence_threshold]
-        
+
         if not filtered:
             return []
-        
+
         # Sort by start position, then by length (descending)
         sorted_entities = sorted(filtered, key=lambda e: (e.start_pos, -(e.end_pos - e.start_pos)))
-        
+
         merged = []
-        skip_indices = set()
-        
-        for i, entity in enumerate(sorted_entities):
-            if i in skip_indices:
-                continue
-            
-            # Check for overlaps with remaining entities
-            conflicting = []
-            for j in range(i + 1, len(sorted_entities)):
-                if j in skip_indices:
-                    continue
-                
-                other = sorted_entities[j]
-                
-                # If entities overlap
-                if entity.overlaps_with(other):
-                    conflicting.append((j, other))
-            
-            # Resolve conflicts
-            if conflicting:
-                # Keep the longest span, or highest confidence if same length
-                best_entity = entity
-                best_idx = i
-                
-                for idx, other in conflicting:
-                    entity_len = entity.end_pos - entity.start_pos
-                    other_len = other.end_pos - other.start_pos
-                    
-                    if other_len > entity_len or (other_len == entity_len and other.score > best_entity.score):
-                        best_entity = other
-                        best_idx = idx
-                
-                # Mark others for skipping
-                skip_indices.add(i)
-                for idx, _ in conflicting:
-                    skip_indices.add(idx)
-                skip_indices.discard(best_idx)
-                
-                if best_idx == i:
-                    merged.append(entity)
+        current = sorted_entities[0]
+
+        for entity in sorted_entities[1:]:
+            # Sorted by start, so overlapping the current winner means starting before its end
+            if entity.start_pos < current.end_pos:
+                if EntityMerger._wins_over(entity, current):
+                    current = entity
             else:
-                merged.append(entity)
-        
-        # Final sort by position
-        merged.sort(key=lambda e: e.start_pos)
-        
+                merged.append(current)
+                current = entity
+
+        merged.append(current)
+
         logger.info(f"Merged {len(entities)} entities into {len(merged)} unique entities")
         return merged
@@ -1,6 +1,7 @@
 import logging
-from typing import List
+from typing import List, Tuple
 from ..core.entities import Entity
+from ..core.offset_map import OffsetMap, ReplacementSpan
 
 logger = logging.getLogger(__name__)
 
@@ -9,37 +10,65 @@ logger = logging.getLogger(__name__)
 
 class TextAnonymizer:
     """Anonymizes text by replacing entities with placeholders"""
-    
+
     @staticmethod
     def anonymize(original_text: str, entities: List[Entity]) -> str:
         """Replace entities with [LABEL] placeholders while preserving formatting"""
+        anonymized, _ = TextAnonymizer.anonymize_with_offsets(original_text, entities)
+        return anonymized
+
+    @staticmethod
+    def anonymize_with_offsets(original_text: str, entities: List[Entity]) -> Tuple[str, OffsetMap]:
+        """
+        Replace entities with [LABEL] placeholders in a single forward pass
+        Returns the anonymized text and the offset map between both texts
+        """
         if not entities:
-            return original_text
-        
-        # Sort entities by position (reverse order for replacement)
-        sorted_entities = sorted(entities, key=lambda e: e.start_pos, reverse=True)
-        
-        anonymized = original_text
-        
+            return original_text, OffsetMap([])
+
+        # Sort entities by position, segments are written once in text order
+        sorted_entities = sorted(entities, key=lambda e: e.start_pos)
+
+        segments = []
+        spans = []
+        cursor = 0  # Position in the original text
+        output_length = 0  # Length of the anonymized text written so far
+        text_length = len(original_text)
+
         for entity in sorted_entities:
             placeholder = f"[{entity.entity_type}]"
-            
+
             # Verify positions are within bounds
-            if entity.start_pos < 0 or entity.end_pos > len(anonymized):
+            if entity.start_pos < 0 or entity.end_pos > text_length:
                 logger.warning(f"Entity position out of bounds: {entity}")
                 continue
-            
+
             if entity.start_pos >= entity.end_pos:
                 logger.warning(f"Invalid entity positions: {entity}")
                 continue
-            
-            # Replace entity text with placeholder
-            before = anonymized[:entity.start_pos]
-            after = anonymized[entity.end_pos:]
-            anonymized = before + placeholder + after
-            
+
+            if entity.start_pos < cursor:
+                logger.warning(f"Entity overlaps a previous replacement: {entity}")
+                continue
+
+            # Copy the untouched text, then the placeholder
+            segments.append(original_text[cursor:entity.start_pos])
+            output_length += entity.start_pos - cursor
+            segments.append(placeholder)
+            spans.append(ReplacementSpan(
+                original_start=entity.start_pos,
+                original_end=entity.end_pos,
+                anonymized_start=output_length,
+                anonymized_end=output_length + len(placeholder),
+                entity_type=entity.entity_type
+            ))
+            output_length += len(placeholder)
+            cursor = entity.end_pos
+
             # Log for debugging
             logger.debug(f"Replaced '{entity.text}' at {entity.start_pos}-{entity.end_pos} with {placeholder}")
-        
+
+        segments.append(original_text[cursor:])
+
         logger.info(f"Anonymized {len(entities)} entities")
-        return anonymized
+        return "".join(segments), OffsetMap(spans)
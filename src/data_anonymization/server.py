@@ -0,0 +1,191 @@
+"""
+Local anonymization service holding a single copy of the models
+
+Concurrent requests are collected into micro-batches for a few milliseconds
+and anonymized together by MedicalTextAnonymizer.anonymize_texts, so UI
+workers only need RemoteAnonymizer and no model memory.
+
+Run from the repository root:
+    python -m src.data_anonymization.server --port 8765
+then point the app to it with ANONYMIZATION_SERVER_URL=http://127.0.0.1:8765
+"""
+import argparse
+import json
+import logging
+import queue
+import threading
+import time
+import urllib.request
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from .orchestrator import MedicalTextAnonymizer
+from .utils import json_default, setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Groups texts submitted by concurrent threads into batched anonymize_texts calls"""
+
+    def __init__(self, anonymizer: MedicalTextAnonymizer, max_batch_size: int = 16, max_wait_ms: float = 10.0):
+        self.anonymizer = anonymizer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self.batches = 0
+        self.requests = 0
+        self._worker = threading.Thread(target=self._run, name="anonymization-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, text: str) -> Future:
+        """Queue a text, the future resolves to its anonymize_text result"""
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def _next_batch(self) -> List[Tuple[str, Future]]:
+        """Block for a first request, then gather more until the window closes or the batch is full"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            texts = [text for text, _ in batch]
+            try:
+                results = self.anonymizer.anonymize_texts(texts)
+            except Exception as e:
+                logger.error(f"Batch of {len(batch)} texts failed: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.requests += len(batch)
+            logger.info(f"Anonymized a batch of {len(batch)} texts ({sum(len(t) for t in texts)} chars)")
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'batches': self.batches,
+            'mean_batch_size': round(self.requests / self.batches, 2) if self.batches else 0.0,
+            'queued': self._queue.qsize()
+        }
+
+
+def _make_handler(batcher: MicroBatcher):
+    class AnonymizationHandler(BaseHTTPRequestHandler):
+        """POST /anonymize {"text": ...} returns the anonymize_text result, GET /health the server state"""
+
+        def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+            body = json.dumps(payload, ensure_ascii=False, default=json_default).encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path != "/health":
+                self._send_json(404, {'error': f"Unknown path {self.path}"})
+                return
+            self._send_json(200, {
+                'status': 'ok',
+                'batching': batcher.stats(),
+                'models': batcher.anonymizer.model_registry.memory_report()
+            })
+
+        def do_POST(self):
+            if self.path != "/anonymize":
+                self._send_json(404, {'error': f"Unknown path {self.path}"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                text = json.loads(self.rfile.read(length))['text']
+            except (ValueError, KeyError, TypeError) as e:
+                self._send_json(400, {'error': f"Expected a JSON body with a 'text' field: {e}"})
+                return
+            if not isinstance(text, str):
+                # Rejected here so that a bad request never fails the batch it would join
+                self._send_json(400, {'error': f"'text' must be a string, got {type(text).__name__}"})
+                return
+
+            try:
+                result = batcher.submit(text).result()
+            except Exception as e:
+                self._send_json(500, {'error': str(e)})
+                return
+            self._send_json(200, result)
+
+        def log_message(self, format, *args):
+            logger.debug(f"{self.address_string()} {format % args}")
+
+    return AnonymizationHandler
+
+
+def serve(anonymizer: Optional[MedicalTextAnonymizer] = None, host: str = "127.0.0.1", port: int = 8765,
+          max_batch_size: int = 16, max_wait_ms: float = 10.0) -> ThreadingHTTPServer:
+    """Build the HTTP server, call serve_forever() on the result to run it"""
+    anonymizer = anonymizer or MedicalTextAnonymizer()
+    batcher = MicroBatcher(anonymizer, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    server = ThreadingHTTPServer((host, port), _make_handler(batcher))
+    logger.info(f"Anonymization server listening on http://{host}:{server.server_address[1]}")
+    return server
+
+
+class RemoteAnonymizer:
+    """Thin client of the anonymization server with the MedicalTextAnonymizer interface used by the app"""
+
+    def __init__(self, base_url: str, timeout: float = 300.0):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def _request(self, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(f"{self.base_url}{path}", data=data,
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def anonymize_text(self, text: str) -> Dict[str, Any]:
+        return self._request("/anonymize", {'text': text})
+
+    def health(self) -> Dict[str, Any]:
+        return self._request("/health")
+
+    display_results = staticmethod(MedicalTextAnonymizer.display_results)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve MedicalTextAnonymizer over HTTP with micro-batching")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch-size", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    server = serve(host=args.host, port=args.port, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -63,3 +63,101 @@ def test_anonymizer_with_french_medical_text():
     # Print results for inspection
     print("\n=== ANONYMIZATION TEST RESULTS ===")
     anonymizer.display_results(result, show_dectected_entities=True, stat=True)
+
+
+def test_anonymize_stream_yields_contiguous_segments():
+    """Streamed segments cover the document in order, pages are accepted as input"""
+    anonymizer = MedicalTextAnonymizer(chunk_size=500, chunk_overlap=100)
+    text = "\n".join([FRENCH_MEDICAL_TEXT] * 3)
+    pages = [text[i:i + 700] for i in range(0, len(text), 700)]
+
+    segments = list(anonymizer.anonymize_stream(iter(pages), window_chars=1500))
+
+    assert len(segments) > 1
+    assert segments[0]['start'] == 0
+    assert segments[-1]['end'] == len(text)
+    for previous, segment in zip(segments, segments[1:]):
+        assert segment['start'] == previous['end']
+    for segment in segments:
+        for entity in segment['entities']:
+            assert segment['start'] <= entity['start'] < entity['end'] <= segment['end']
+            assert text[entity['start']:entity['end']] == entity['text']
+
+
+def test_aanonymize_many_matches_anonymize_text():
+    """Async results come back in input order and equal the blocking ones"""
+    import asyncio
+
+    anonymizer = MedicalTextAnonymizer(chunk_size=500, chunk_overlap=100, async_concurrency=2)
+    texts = [FRENCH_MEDICAL_TEXT, FRENCH_MEDICAL_TEXT[:300], FRENCH_MEDICAL_TEXT[300:]]
+
+    results = asyncio.run(anonymizer.aanonymize_many(texts))
+
+    assert [r['original_text'] for r in results] == texts
+    for text, result in zip(texts, results):
+        assert result['anonymized_text'] == anonymizer.anonymize_text(text)['anonymized_text']
+
+
+def test_strided_mode_keeps_non_pii_text():
+    """Strided windows only report real entities, the medical content stays readable"""
+    anonymizer = MedicalTextAnonymizer(chunking="strided", max_tokens=128, stride=32)
+
+    result = anonymizer.anonymize_text(FRENCH_MEDICAL_TEXT)
+
+    assert result['statistics']['total_entities'] > 0
+    assert not {'O', 'OTHER'} & set(result['statistics']['entity_counts'])
+    for word in ("déséquilibre glycémique", "polyurie", "polydipsie", "asthénie"):
+        assert word in result['anonymized_text']
+
+
+def test_anonymize_stream_small_windows_keep_the_text_length():
+    """Growing the buffer never re-reads text, whatever the window size"""
+    anonymizer = MedicalTextAnonymizer(chunk_size=500, chunk_overlap=100)
+
+    for window_chars in (50, 80):
+        segments = list(anonymizer.anonymize_stream(FRENCH_MEDICAL_TEXT, window_chars=window_chars))
+
+        entities = [e for segment in segments for e in segment['entities']]
+        expected_length = len(FRENCH_MEDICAL_TEXT) + sum(len(f"[{e['type']}]") - (e['end'] - e['start'])
+                                                         for e in entities)
+        assert segments[-1]['end'] == len(FRENCH_MEDICAL_TEXT)
+        assert sum(len(segment['anonymized_text']) for segment in segments) == expected_length
+
+
+PII = ("Sophie Dubois", "Leroy", "sophie.dubois@email.com", "04 72 34 56 78")
+
+
+def assert_incremental_result(result, text):
+    assert result['original_text'] == text
+    for entity in result['entities']:
+        assert text[entity['start']:entity['end']] == entity['text']
+    for pii in PII:
+        assert pii not in result['anonymized_text']
+
+
+def incremental_run(new_text):
+    anonymizer = MedicalTextAnonymizer(chunk_size=500, chunk_overlap=100)
+    previous = anonymizer.anonymize_text(FRENCH_MEDICAL_TEXT)
+    return previous, anonymizer.anonymize_incremental(previous, new_text)
+
+
+def test_anonymize_incremental_without_change_returns_the_previous_result():
+    previous, result = incremental_run(FRENCH_MEDICAL_TEXT)
+    assert result is previous
+
+
+def test_anonymize_incremental_edit_at_the_start():
+    text = "Compte rendu d'hospitalisation.\n" + FRENCH_MEDICAL_TEXT
+    assert_incremental_result(incremental_run(text)[1], text)
+
+
+def test_anonymize_incremental_edit_at_the_end():
+    text = FRENCH_MEDICAL_TEXT + "\nRevue en consultation dans trois mois."
+    assert_incremental_result(incremental_run(text)[1], text)
+
+
+def test_anonymize_incremental_edit_inside_an_entity():
+    text = FRENCH_MEDICAL_TEXT.replace("Martin Leroy", "Martin Lemaire-Leroy")
+    result = incremental_run(text)[1]
+    assert_incremental_result(result, text)
+    assert "Lemaire" not in result['anonymized_text']
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from data_anonymization import batch_runner
+
+
+class UppercaseAnonymizer:
+    """MedicalTextAnonymizer stand-in that records the texts it reads"""
+    seen = []
+
+    def __init__(self, **kwargs):
+        pass
+
+    def anonymize_text(self, text):
+        UppercaseAnonymizer.seen.append(text)
+        return {'anonymized_text': text.upper(), 'entities': []}
+
+
+def test_batch_resumes_from_the_manifest(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_runner, "MedicalTextAnonymizer", UppercaseAnonymizer)
+    notes = tmp_path / "notes.jsonl"
+    notes.write_text("".join(json.dumps({"id": f"n{i}", "text": f"note {i}"}) + "\n" for i in range(5)))
+    output_dir = tmp_path / "out"
+
+    totals = batch_runner.run_batch(str(notes), str(output_dir), workers=1, shard_size=2)
+    assert (totals['shards'], totals['docs']) == (3, 5)
+
+    # Forget the last shard as if the job had been killed while writing it
+    manifest_path = output_dir / batch_runner.MANIFEST_NAME
+    manifest = json.loads(manifest_path.read_text())
+    del manifest['completed']['2']
+    manifest_path.write_text(json.dumps(manifest))
+    UppercaseAnonymizer.seen = []
+
+    totals = batch_runner.run_batch(str(notes), str(output_dir), workers=1, shard_size=2)
+
+    assert UppercaseAnonymizer.seen == ["note 4"]
+    assert totals['skipped_shards'] == 2
+    rows = [json.loads(line) for line in (output_dir / "shard-00002.jsonl").read_text().splitlines()]
+    assert rows == [{'id': 'n4', 'anonymized_text': 'NOTE 4', 'entities': []}]
+
+
+def test_resume_with_other_options_is_refused(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_runner, "MedicalTextAnonymizer", UppercaseAnonymizer)
+    notes = tmp_path / "notes.jsonl"
+    notes.write_text(json.dumps({"id": "n0", "text": "note 0"}) + "\n")
+    output_dir = str(tmp_path / "out")
+
+    batch_runner.run_batch(str(notes), output_dir, workers=1, anonymizer_options={'chunking': 'chars'})
+
+    with pytest.raises(ValueError, match="another job"):
+        batch_runner.run_batch(str(notes), output_dir, workers=1, anonymizer_options={'chunking': 'tokens'})
@@ -0,0 +1,27 @@
+from data_anonymization.core.cascade import CascadePolicy
+from data_anonymization.core.entities import ChunkWithPosition, Entity
+
+
+def test_second_model_only_reads_inconclusive_chunks():
+    chunks = [ChunkWithPosition(text="x" * 10, start_offset=i * 10, end_offset=i * 10 + 10, chunk_index=i)
+              for i in range(4)]
+    first_entities = [
+        Entity(text="Dubois", entity_type="NAME", score=0.99, start_pos=1, end_pos=7, chunk_index=0),
+        Entity(text="Lyon", entity_type="LOCATION", score=0.98, start_pos=12, end_pos=16, chunk_index=1),
+        Entity(text="CHU", entity_type="ORGANIZATION", score=0.6, start_pos=21, end_pos=24, chunk_index=2),
+    ]
+
+    selected = CascadePolicy(margin=0.85).select(chunks, first_entities)
+
+    # Chunk 0 has a name, chunk 2 a low score; chunk 1 is conclusive and chunk 3 empty
+    assert [c.chunk_index for c in selected] == [0, 2]
+
+
+def test_contact_candidates_are_escalated_without_rules():
+    texts = ["Patient vu ce jour.", "Tel : 04 72 34 56 78", "Mail sophie@email.com"]
+    chunks = [ChunkWithPosition(text=text, start_offset=0, end_offset=len(text), chunk_index=i)
+              for i, text in enumerate(texts)]
+
+    # The first model found nothing, only the rules would have caught the contact details
+    assert CascadePolicy().select(chunks, []) == []
+    assert [c.chunk_index for c in CascadePolicy().select(chunks, [], escalate_contacts=True)] == [1, 2]
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from data_anonymization.core.entities import ChunkWithPosition, Entity
+from data_anonymization.core.entity_cache import EntityCache
+
+
+HEADER = "Service de diabétologie, Hôpital Edouard Herriot, 5 place d'Arsonval, Lyon."
+
+
+def chunk_at(offset, index):
+    return ChunkWithPosition(text=HEADER, start_offset=offset, end_offset=offset + len(HEADER), chunk_index=index)
+
+
+def test_hits_are_shifted_to_the_new_chunk_position(tmp_path):
+    db_path = str(tmp_path / "entities.sqlite")
+    cache = EntityCache(db_path=db_path)
+    first = chunk_at(0, 0)
+    start = HEADER.index("Edouard Herriot")
+    found = [Entity(text="Edouard Herriot", entity_type="NAME", score=0.8,
+                    start_pos=start, end_pos=start + 15, chunk_index=0, model_source="Piranha")]
+
+    key = cache.make_key(HEADER, "piranha", None, 0.5)
+    assert cache.lookup(key, first) is None
+    cache.store(key, first, found)
+
+    hit = cache.lookup(key, chunk_at(1000, 7))
+    assert hit is not None
+    assert (hit[0].start_pos, hit[0].end_pos, hit[0].chunk_index) == (1000 + start, 1015 + start, 7)
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+    # A new process reads the SQLite tier
+    assert EntityCache(db_path=db_path).lookup(key, first) == found
+    assert cache.make_key(HEADER, "piranha", "v2", 0.5) != key
+    assert cache.make_key(HEADER, "piranha", None, 0.5, {'chunking': 'strided', 'stride': 64}) != \
+        cache.make_key(HEADER, "piranha", None, 0.5, {'chunking': 'strided', 'stride': 32})
+
+
+def test_lru_tier_evicts_oldest_entries():
+    cache = EntityCache(max_entries=2)
+    chunk = chunk_at(0, 0)
+    for name in ("a", "b", "c"):
+        cache.store(name, chunk, [])
+
+    assert cache.lookup("a", chunk) is None
+    assert cache.lookup("c", chunk) == []
+
+
+def test_numpy_scores_are_stored(tmp_path):
+    db_path = str(tmp_path / "entities.sqlite")
+    chunk = chunk_at(0, 0)
+    found = [Entity(text="Lyon", entity_type="LOCATION", score=np.float32(0.93),
+                    start_pos=HEADER.index("Lyon"), end_pos=HEADER.index("Lyon") + 4, chunk_index=0)]
+
+    EntityCache(db_path=db_path).store("key", chunk, found)
+
+    hit = EntityCache(db_path=db_path).lookup("key", chunk)
+    assert hit is not None and type(hit[0].score) is float
+    assert hit[0].score == pytest.approx(0.93)
@@ -0,0 +1,34 @@
+from data_anonymization.core.entities import Entity
+from data_anonymization.processors.entity_merger import EntityMerger
+
+
+def make(start, end, score=0.9, entity_type="NAME"):
+    return Entity(text="x" * (end - start), entity_type=entity_type, score=score,
+                  start_pos=start, end_pos=end)
+
+
+def test_merge_prefers_longest_span_then_highest_score():
+    entities = [
+        make(0, 6, 0.99),         # shorter than the next one, dropped
+        make(0, 13, 0.70),
+        make(20, 25, 0.60),       # same span from both models, best score wins
+        make(20, 25, 0.95),
+        make(40, 45, 0.30),       # below the threshold
+    ]
+
+    merged = EntityMerger.merge_entities(entities, confidence_threshold=0.5)
+
+    assert [(e.start_pos, e.end_pos, e.score) for e in merged] == [(0, 13, 0.70), (20, 25, 0.95)]
+
+
+def test_merge_chains_overlaps_and_keeps_adjacent_entities():
+    entities = [
+        make(10, 18),
+        make(15, 30),             # longer, replaces the first one
+        make(28, 32),             # overlaps the winner, shorter
+        make(30, 35),             # adjacent to the winner, kept
+    ]
+
+    merged = EntityMerger.merge_entities(entities)
+
+    assert [(e.start_pos, e.end_pos) for e in merged] == [(15, 30), (30, 35)]
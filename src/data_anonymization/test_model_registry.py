@@ -0,0 +1,34 @@
+from data_anonymization.models.base import PIIModel
+from data_anonymization.models.registry import ModelRegistry
+
+
+class CountingModel(PIIModel):
+    """PIIModel stand-in that counts loads instead of pulling weights"""
+    loads = 0
+
+    def __init__(self, **kwargs):
+        super().__init__("dummy/model", **kwargs)
+
+    def _load_model(self):
+        CountingModel.loads += 1
+
+
+def test_registry_loads_each_config_once():
+    registry = ModelRegistry()
+    CountingModel.loads = 0
+
+    first = registry.get(CountingModel)
+    second = registry.get(CountingModel, use_fast=True)
+    other_task = registry.get(CountingModel, task="token-classification")
+
+    assert first is second
+    assert other_task is not first
+    assert CountingModel.loads == 2
+
+    assert registry.evict(CountingModel)
+    assert not registry.is_loaded(CountingModel)
+    assert registry.is_loaded(CountingModel, task="token-classification")
+
+    report = registry.memory_report()
+    assert report['loaded_models'] == 1
+    assert report['models'][0]['config']['task'] == 'token-classification'
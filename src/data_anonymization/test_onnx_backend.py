@@ -0,0 +1,20 @@
+import pytest
+
+pytest.importorskip("optimum.onnxruntime")
+
+from data_anonymization import PiranhaPIIModel, CamembertNERWithDatesModel
+from data_anonymization.core.text_splitter import PositionAwareTextSplitter
+from data_anonymization.test_anonymizer import FRENCH_MEDICAL_TEXT
+
+
+@pytest.mark.parametrize("model_cls", [PiranhaPIIModel, CamembertNERWithDatesModel])
+def test_onnx_backend_matches_torch(model_cls):
+    chunks = PositionAwareTextSplitter(chunk_size=500, chunk_overlap=100).split_text_with_positions(FRENCH_MEDICAL_TEXT)
+
+    torch_entities = model_cls(backend="torch").detect_entities_in_chunks(chunks)
+    onnx_entities = model_cls(backend="onnx").detect_entities_in_chunks(chunks)
+
+    assert [(e.start_pos, e.end_pos, e.entity_type) for e in onnx_entities] == \
+        [(e.start_pos, e.end_pos, e.entity_type) for e in torch_entities]
+    for onnx_entity, torch_entity in zip(onnx_entities, torch_entities):
+        assert onnx_entity.score == pytest.approx(torch_entity.score, abs=1e-3)
@@ -0,0 +1,28 @@
+from data_anonymization.core.entities import ChunkWithPosition
+from data_anonymization.models.rules import RuleBasedPIIDetector
+from data_anonymization.test_anonymizer import FRENCH_MEDICAL_TEXT
+
+
+def test_rules_find_structured_pii_in_the_french_sample():
+    chunk = ChunkWithPosition(text=FRENCH_MEDICAL_TEXT, start_offset=100, end_offset=100 + len(FRENCH_MEDICAL_TEXT),
+                              chunk_index=3)
+
+    entities = RuleBasedPIIDetector().detect_entities_in_chunk(chunk)
+    found = {(e.text, e.entity_type) for e in entities}
+
+    assert ("04 72 34 56 78", "PHONE") in found
+    assert ("06 12 34 56 89", "PHONE") in found
+    assert ("sophie.dubois@email.com", "EMAIL") in found
+    assert ("1 78 03 45 123 456", "ID") in found
+    assert ("69002", "ADDRESS") in found
+    assert ("15 mars 1978", "DATE") in found
+    for e in entities:
+        assert FRENCH_MEDICAL_TEXT[e.start_pos - 100:e.end_pos - 100] == e.text
+        assert e.model_source == "Rules" and e.chunk_index == 3
+
+
+def test_candidate_scan_counts_every_capitalized_word():
+    for text in ("Nom : Dupont.", "Patient (Dupont) revu.", "Dubois a été admise pour une toux.",
+                 "Adressée par le Dr Leroy."):
+        assert RuleBasedPIIDetector.has_candidates(text)
+    assert not RuleBasedPIIDetector.has_candidates("patiente asthénique, polyurie et polydipsie.")
@@ -0,0 +1,100 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pytest
+
+from data_anonymization.server import MicroBatcher, RemoteAnonymizer, serve
+
+
+class RecordingAnonymizer:
+    """MedicalTextAnonymizer stand-in that records the batches it receives"""
+
+    def __init__(self):
+        self.batches = []
+
+    def anonymize_texts(self, texts):
+        self.batches.append(list(texts))
+        return [{'anonymized_text': text.upper()} for text in texts]
+
+
+class NumpyScoreAnonymizer:
+    """Returns entities scored like the HF pipeline output, with numpy floats"""
+
+    def anonymize_texts(self, texts):
+        return [{'anonymized_text': "[NAME]",
+                 'entities': [{'text': text, 'type': 'NAME', 'score': np.float32(0.97)}]} for text in texts]
+
+
+def test_concurrent_requests_share_a_batch():
+    anonymizer = RecordingAnonymizer()
+    batcher = MicroBatcher(anonymizer, max_batch_size=8, max_wait_ms=200)
+
+    barrier = threading.Barrier(4)
+    results = {}
+
+    def request(i):
+        barrier.wait()
+        results[i] = batcher.submit(f"note {i}").result(timeout=10)
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {i: {'anonymized_text': f"NOTE {i}"} for i in range(4)}
+    assert len(anonymizer.batches) < 4
+    assert batcher.stats()['requests'] == 4
+
+
+def test_numpy_scores_are_served_as_json():
+    anonymizer = NumpyScoreAnonymizer()
+    server = serve(anonymizer, port=0, max_wait_ms=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = RemoteAnonymizer(f"http://127.0.0.1:{server.server_address[1]}", timeout=10)
+        result = client.anonymize_text("Dr Leroy")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert result['entities'][0]['score'] == pytest.approx(0.97)
+
+
+def test_invalid_text_is_rejected_without_failing_the_batch():
+    anonymizer = RecordingAnonymizer()
+    server = serve(anonymizer, port=0, max_wait_ms=200)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/anonymize"
+
+    barrier = threading.Barrier(4)
+    statuses = {}
+
+    def post(i, payload):
+        request = urllib.request.Request(url, data=json.dumps(payload).encode('utf-8'),
+                                         headers={'Content-Type': 'application/json'})
+        barrier.wait()
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                statuses[i] = response.status
+        except urllib.error.HTTPError as e:
+            statuses[i] = e.code
+
+    payloads = [{'text': "note 0"}, {'text': None}, {'text': "note 2"}, ["note 3"]]
+    threads = [threading.Thread(target=post, args=(i, payload)) for i, payload in enumerate(payloads)]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert statuses == {0: 200, 1: 400, 2: 200, 3: 400}
+    assert sorted(text for batch in anonymizer.batches for text in batch) == ["note 0", "note 2"]
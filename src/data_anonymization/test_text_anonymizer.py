@@ -0,0 +1,32 @@
+from data_anonymization.core.entities import Entity
+from data_anonymization.processors.text_anonymizer import TextAnonymizer
+
+
+TEXT = "Mme Sophie Dubois, tel 04 72 34 56 78, suivie par Dr Leroy."
+
+
+def entity(fragment, entity_type):
+    start = TEXT.index(fragment)
+    return Entity(text=fragment, entity_type=entity_type, score=0.9,
+                  start_pos=start, end_pos=start + len(fragment))
+
+
+def test_anonymize_with_offsets_rewrites_in_one_pass():
+    entities = [
+        entity("Leroy", "NAME"),
+        entity("Sophie Dubois", "NAME"),
+        entity("04 72 34 56 78", "PHONE"),
+    ]
+
+    anonymized, offset_map = TextAnonymizer.anonymize_with_offsets(TEXT, entities)
+
+    assert anonymized == "Mme [NAME], tel [PHONE], suivie par Dr [NAME]."
+    assert anonymized == TextAnonymizer.anonymize(TEXT, entities)
+    assert len(offset_map) == 3
+
+    # Untouched text maps both ways, positions inside an entity map to its placeholder
+    suivie = TEXT.index("suivie")
+    assert anonymized[offset_map.to_anonymized(suivie):].startswith("suivie")
+    assert offset_map.to_original(offset_map.to_anonymized(suivie)) == suivie
+    assert offset_map.to_anonymized(TEXT.index("Dubois")) == anonymized.index("[NAME]")
+    assert offset_map.to_original(anonymized.index("[PHONE]") + 2) == TEXT.index("04 72")
@@ -0,0 +1,18 @@
+from data_anonymization.core.text_diff import edit_bounds
+
+
+def test_edit_bounds_locates_the_replaced_span():
+    old = "Suivi par le Docteur Martin Leroy depuis 2015."
+    new = "Suivi par le Docteur Jacques Moreau depuis 2015."
+
+    start, old_end, new_end = edit_bounds(old, new)
+
+    assert old[start:old_end] == "Martin Leroy"
+    assert new[start:new_end] == "Jacques Moreau"
+    assert old[:start] + new[start:new_end] + old[old_end:] == new
+
+
+def test_edit_bounds_handles_insertions_and_identical_texts():
+    assert edit_bounds("aaa", "aaaa") == (3, 3, 4)
+    assert edit_bounds("same", "same") == (4, 4, 4)
+    assert edit_bounds("abc", "c") == (0, 2, 0)
@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+from data_anonymization.core.entities import Entity
+from data_anonymization.utils import entity_delta, process_memory
+
+
+def entity(start, end, entity_type, score=0.9):
+    return Entity(text="x" * (end - start), entity_type=entity_type, score=score,
+                  start_pos=start, end_pos=end)
+
+
+def test_entity_delta_counts_matches_and_changes():
+    reference = [entity(0, 5, "NAME"), entity(10, 20, "DATE"), entity(30, 35, "PHONE")]
+    candidate = [entity(0, 5, "NAME", 0.8), entity(10, 20, "ID"), entity(40, 45, "EMAIL")]
+
+    delta = entity_delta(reference, candidate)
+
+    assert delta['matched'] == 1
+    assert delta['type_changed'] == 1
+    assert delta['missing'] == 1
+    assert delta['extra'] == 1
+    assert delta['recall'] == round(1 / 3, 4)
+    assert delta['mean_abs_score_delta'] == 0.1
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup"), reason="needs Linux /proc")
+def test_process_memory_reads_proc():
+    memory = process_memory()
+
+    assert memory['rss_mb'] > 0
+    assert memory['pss_mb'] <= memory['rss_mb']
+    assert memory['shared_mb'] + memory['private_mb'] == pytest.approx(memory['rss_mb'], abs=0.2)
@@ -1,8 +1,89 @@
 import logging
+import os
+from typing import Any, Dict, List, Optional
+
+from .core.entities import Entity
 
 def setup_logging(level=logging.INFO):
     """Configure logging for the anonymization module"""
     logging.basicConfig(
         level=level,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
\ No newline at end of file
+    )
+
+
+def json_default(value: Any) -> Any:
+    """json.dumps default for numpy scalars (model scores), e.g. json.dumps(result, default=json_default)"""
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def get_cache_dir(*parts: str) -> str:
+    """
+    Directory for derived model artifacts (ONNX exports, quantized weights)
+    Set ANONYMIZATION_CACHE_DIR to move it, defaults to ~/.cache/data_anonymization
+    """
+    root = os.environ.get('ANONYMIZATION_CACHE_DIR',
+                          os.path.join(os.path.expanduser('~'), '.cache', 'data_anonymization'))
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def process_memory(pid: Optional[int] = None) -> Dict[str, float]:
+    """
+    Memory of a process in MB from /proc/<pid>/smaps_rollup (Linux only, empty elsewhere)
+    PSS splits shared pages between the processes mapping them, so summing the PSS of
+    forked workers gives their real footprint where the RSS counts shared weights in each
+    """
+    path = f"/proc/{pid or os.getpid()}/smaps_rollup"
+    if not os.path.exists(path):
+        return {}
+
+    fields: Dict[str, int] = {}
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+
+    def mb(*names: str) -> float:
+        return round(sum(fields.get(name, 0) for name in names) / 1024, 1)
+
+    return {
+        'rss_mb': mb('Rss'),
+        'pss_mb': mb('Pss'),
+        'shared_mb': mb('Shared_Clean', 'Shared_Dirty'),
+        'private_mb': mb('Private_Clean', 'Private_Dirty')
+    }
+
+
+def entity_delta(reference: List[Entity], candidate: List[Entity]) -> Dict[str, Any]:
+    """
+    Compare the entities of a candidate model (e.g. int8) with a reference run (fp32)
+    Entities match on exact span and type, precision and recall are relative to the reference
+    """
+    reference_spans = {(e.start_pos, e.end_pos): e for e in reference}
+    candidate_spans = {(e.start_pos, e.end_pos): e for e in candidate}
+
+    matched = [span for span in reference_spans
+               if span in candidate_spans and reference_spans[span].entity_type == candidate_spans[span].entity_type]
+    type_changed = [span for span in reference_spans
+                    if span in candidate_spans and span not in matched]
+    score_deltas = [candidate_spans[span].score - reference_spans[span].score for span in matched]
+
+    precision = len(matched) / len(candidate_spans) if candidate_spans else 1.0
+    recall = len(matched) / len(reference_spans) if reference_spans else 1.0
+    return {
+        'reference_entities': len(reference_spans),
+        'candidate_entities': len(candidate_spans),
+        'matched': len(matched),
+        'type_changed': len(type_changed),
+        'missing': len(reference_spans.keys() - candidate_spans.keys()),
+        'extra': len(candidate_spans.keys() - reference_spans.keys()),
+        'precision': round(precision, 4),
+        'recall': round(recall, 4),
+        'f1': round(2 * precision * recall / (precision + recall), 4) if precision + recall else 0.0,
+        'mean_abs_score_delta': round(sum(abs(d) for d in score_deltas) / len(score_deltas), 4) if score_deltas else 0.0
+    }
@@ -3,7 +3,11 @@ from src.extraction.model import run_async
 from src.extraction.splitter import split_obser_extraction
 from src.extraction.convert_medical_history import convert_medical_history
 from src.extraction.comorbidity_to_icd10 import ComorbidityICD10Converter
+from src.extraction.icd10_index import ICD10Index
 from src.extraction.extract_lifestyle import LifestyleExtractor
+from src.extraction.lifestyle_rules import LifestyleRuleEngine
+from src.extraction.rate_limiter import RateLimiter
+from src.extraction.llm_cache import SQLiteLLMCache, get_llm_cache
 
 __all__ = [
     "process_csv",
@@ -11,6 +15,11 @@ __all__ = [
     "split_obser_extraction",
     "convert_medical_history",
     "ComorbidityICD10Converter",
-    "LifestyleExtractor"
+    "ICD10Index",
+    "LifestyleExtractor",
+    "LifestyleRuleEngine",
+    "RateLimiter",
+    "SQLiteLLMCache",
+    "get_llm_cache"
 ]      
 
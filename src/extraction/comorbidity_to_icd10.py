@@ -6,7 +6,7 @@ using DeepSeek via LangChain
 import os
 import json
 import re
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 import pandas as pd
 from dotenv import load_dotenv
@@ -15,6 +15,11 @@ from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
+from src.extraction.icd10_index import ICD10Index
+from src.extraction.llm_cache import get_llm_cache
+
+ICD10_CODE_PATTERN = re.compile(r"^[A-Z]\d{2}(\.\d{1,2})?$")
+
 
 class ComorbidityICD10Converter:
     def __init__(
@@ -23,6 +28,12 @@ class ComorbidityICD10Converter:
         model_name: str = "deepseek-chat",
         temperature: float = 0.3,
         max_tokens: int = 1000,
+        batch_max_tokens: int = 4000,
+        max_batch_retries: int = 2,
+        use_cache: bool = True,
+        index: Optional[ICD10Index] = None,
+        use_index: bool = True,
+        learn_from_llm: bool = True,
     ):
         """
         Initialize the ICD-10 converter
@@ -30,6 +41,14 @@ class ComorbidityICD10Converter:
         Args:
             api_key: DeepSeek API key (optional, loaded from env if None)
             model_name: DeepSeek model name
+            batch_max_tokens: Output token limit of a multi-item request
+            max_batch_retries: Re-requests of the items missing from a batch
+                answer before falling back to one request per item
+            use_cache: Reuse answers of identical requests from the shared LLM cache
+            index: Local CIM-10 index, defaults to dictionnaries/cim10_index.csv
+                plus the labels learned in previous runs
+            use_index: Resolve known comorbidities from the index before asking the LLM
+            learn_from_llm: Add single-code, high-confidence LLM answers to the index
         """
         load_dotenv()
 
@@ -43,6 +62,7 @@ class ComorbidityICD10Converter:
             model=model_name,
             temperature=temperature,
             max_tokens=max_tokens,
+            cache=get_llm_cache() if use_cache else False,
         )
 
         self.prompt_template = ChatPromptTemplate.from_messages([
@@ -74,6 +94,49 @@ Réponds UNIQUEMENT avec un objet JSON valide :
 
         self.chain = self.prompt_template | self.llm | StrOutputParser()
 
+        # Several comorbidities per request, the instructions are paid once per batch
+        self.batch_prompt_template = ChatPromptTemplate.from_messages([
+            (
+                "system",
+                "Tu es un expert médical spécialisé en codage CIM-10.",
+            ),
+            (
+                "human",
+                """Analyse chacun des textes médicaux numérotés suivants et extrais le ou les codes CIM-10 de chacun.
+
+{comorbidities}
+
+Réponds UNIQUEMENT avec un tableau JSON valide contenant un objet par texte, avec son numéro :
+
+[
+    {{
+        "index": 1,
+        "codes_cim10": [
+            {{
+                "code": "CODE_CIM10",
+                "libelle": "Description",
+                "confiance": "haute/moyenne/basse"
+            }}
+        ],
+        "notes": "commentaires éventuels"
+    }}
+]"""
+            ),
+        ])
+
+        self.batch_chain = (
+            self.batch_prompt_template
+            | self.llm.bind(max_tokens=batch_max_tokens)
+            | StrOutputParser()
+        )
+        self.max_batch_retries = max_batch_retries
+        # LLM requests sent, to compare the single and batched modes
+        self.llm_requests = 0
+
+        self.index = (index or ICD10Index()) if use_index else None
+        self.learn_from_llm = learn_from_llm
+        self.index_hits = 0
+
     @staticmethod
     def extract_json_from_response(response: str) -> Optional[Dict]:
         """Extract JSON object from LLM response"""
@@ -85,9 +148,59 @@ Réponds UNIQUEMENT avec un objet JSON valide :
                 pass
         return None
 
+    @staticmethod
+    def extract_json_array_from_response(response: str) -> Optional[List]:
+        """Extract the JSON array from a batch LLM response"""
+        start, end = response.find("["), response.rfind("]")
+        if start == -1 or end < start:
+            return None
+        try:
+            items = json.loads(response[start:end + 1])
+        except json.JSONDecodeError:
+            return None
+        return items if isinstance(items, list) else None
+
+    def _lookup_index(self, comorbidity: str) -> Optional[Dict]:
+        """Result of a confident index match, in the LLM answer format"""
+        if self.index is None:
+            return None
+        match = self.index.lookup(comorbidity)
+        if match is None:
+            return None
+
+        self.index_hits += 1
+        # Spelling variants may still differ from the label, only exact matches are certain
+        confidence = "haute" if match["match"] == "exact" else "moyenne"
+        return {
+            "comorbidite_originale": comorbidity,
+            "codes_cim10": [{"code": match["code"], "libelle": match["libelle"], "confiance": confidence}],
+            "notes": f"Index CIM-10 local ({match['match']} : {match['label']})",
+            "source": "index",
+        }
+
+    def _learn(self, comorbidity: str, result: Dict) -> None:
+        """Add an unambiguous, high-confidence LLM answer to the index"""
+        # NaN cells of the input CSV reach the LLM as "nan" but are never learned
+        if self.index is None or not self.learn_from_llm or "erreur" in result or not isinstance(comorbidity, str):
+            return
+        codes = result.get("codes_cim10") or []
+        if len(codes) != 1 or not isinstance(codes[0], dict):
+            return
+        code = str(codes[0].get("code", "")).strip().upper()
+        if codes[0].get("confiance") == "haute" and ICD10_CODE_PATTERN.match(code):
+            self.index.add(comorbidity, code, str(codes[0].get("libelle", "")))
+
     def convert_to_icd10(self, comorbidity: str) -> Dict:
-        """Convert a comorbidity string to ICD-10"""
+        """Convert a comorbidity string to ICD-10, from the local index when it knows it"""
+        result = self._lookup_index(comorbidity)
+        if result is None:
+            result = self._convert_with_llm(comorbidity)
+            self._learn(comorbidity, result)
+        return result
+
+    def _convert_with_llm(self, comorbidity: str) -> Dict:
         try:
+            self.llm_requests += 1
             response = self.chain.invoke({"comorbidity": comorbidity})
             result = self.extract_json_from_response(response)
 
@@ -109,19 +222,87 @@ Réponds UNIQUEMENT avec un objet JSON valide :
                 "erreur": "API error",
             }
 
+    def _request_batch(self, comorbidities: List[str]) -> Dict[int, Dict]:
+        """One multi-item request, returns the valid answers keyed by position in the list"""
+        numbered = "\n".join(f"{i}. {text}" for i, text in enumerate(comorbidities, start=1))
+        try:
+            self.llm_requests += 1
+            response = self.batch_chain.invoke({"comorbidities": numbered})
+        except Exception:
+            return {}
+
+        answers = {}
+        for item in self.extract_json_array_from_response(response) or []:
+            if not isinstance(item, dict) or not isinstance(item.get("codes_cim10"), list):
+                continue
+            try:
+                position = int(item.get("index")) - 1
+            except (TypeError, ValueError):
+                continue
+            if 0 <= position < len(comorbidities):
+                answers[position] = {
+                    "comorbidite_originale": comorbidities[position],
+                    "codes_cim10": item["codes_cim10"],
+                    "notes": item.get("notes", ""),
+                }
+        return answers
+
+    def convert_batch_to_icd10(self, comorbidities: List[str]) -> List[Dict]:
+        """
+        Convert several comorbidities with one request, same results as convert_to_icd10
+        Items known to the index are not sent. Items missing from the answer (or
+        invalid) are re-requested alone in a smaller batch, those still missing
+        after max_batch_retries get a single request
+        """
+        results: Dict[int, Dict] = {}
+        pending = []
+        for i, comorbidity in enumerate(comorbidities):
+            result = self._lookup_index(comorbidity)
+            if result is None:
+                pending.append(i)
+            else:
+                results[i] = result
+
+        for _ in range(1 + self.max_batch_retries):
+            if not pending:
+                break
+            answers = self._request_batch([comorbidities[i] for i in pending])
+            for position, result in answers.items():
+                results[pending[position]] = result
+                self._learn(comorbidities[pending[position]], result)
+            pending = [i for i in pending if i not in results]
+
+        for i in pending:
+            results[i] = self._convert_with_llm(comorbidities[i])
+            self._learn(comorbidities[i], results[i])
+
+        return [results[i] for i in range(len(comorbidities))]
+
     def process_csv(
         self,
         input_file: str,
         output_file: str = "comorbidities_with_icd10.csv",
+        batch_size: int = 1,
     ) -> pd.DataFrame:
-        """Process CSV file and add ICD-10 codes"""
+        """
+        Process CSV file and add ICD-10 codes
+
+        Args:
+            batch_size: Comorbidities coded per LLM request, 1 sends one request per row
+        """
         df = pd.read_csv(input_file)
+        comorbidities = df["Comorbidite"].tolist()
 
-        codes, libelles, confiances, notes, responses = [], [], [], [], []
+        if batch_size > 1:
+            results = []
+            for start in range(0, len(comorbidities), batch_size):
+                results.extend(self.convert_batch_to_icd10(comorbidities[start:start + batch_size]))
+        else:
+            results = [self.convert_to_icd10(comorbidity) for comorbidity in comorbidities]
 
-        for _, row in df.iterrows():
-            result = self.convert_to_icd10(row["Comorbidite"])
+        codes, libelles, confiances, notes, responses = [], [], [], [], []
 
+        for result in results:
             if result.get("codes_cim10"):
                 code = result["codes_cim10"][0]
                 codes.append(code.get("code", "N/A"))
@@ -0,0 +1,5 @@
+import os
+
+# src.extraction.model copies the DeepSeek key into OPENAI_API_KEY at import time,
+# tests never reach the API
+os.environ.setdefault("DEEPSEEK_API_KEY", "test-key")
@@ -3,11 +3,11 @@ Extract structured lifestyle information from clinical text
 using DeepSeek via LangChain
 """
 
+import asyncio
 import os
 import json
 import re
-import time
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
 from dotenv import load_dotenv
@@ -17,6 +17,23 @@ from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
+from src.extraction.lifestyle_rules import RULE_FIELDS, LifestyleRuleEngine
+from src.extraction.llm_cache import get_llm_cache
+from src.extraction.rate_limiter import RateLimiter
+
+LIFESTYLE_FIELDS = {
+    "tabac_oui_non": "tabac_actif",
+    "tabac_quantite_PA": "tabac_quantite",
+    "alcool_oui_non": "alcool_actif",
+    "alcool_quantite_g_j": "alcool_quantite",
+    "autres_drogues": "autres_drogues",
+    "autonomie": "autonomie",
+    "sport": "sport",
+    "vit_seul": "vit_seul",
+    "aide_domicile": "aide_domicile",
+    "institutionnalise": "institutionnalise",
+}
+
 
 class LifestyleExtractor:
     def __init__(
@@ -26,9 +43,19 @@ class LifestyleExtractor:
         temperature: float = 0.1,
         max_tokens: int = 500,
         sleep_time: float = 0.1,
+        requests_per_second: Optional[float] = None,
+        use_cache: bool = True,
+        use_rules: bool = True,
     ):
         """
         Initialize lifestyle extractor using DeepSeek + LangChain
+
+        Args:
+            sleep_time: Minimum interval between two LLM calls, 0 disables pacing
+            requests_per_second: API rate limit, overrides sleep_time
+            use_cache: Reuse answers of identical requests from the shared LLM cache
+            use_rules: Resolve formulaic fields with LifestyleRuleEngine, the LLM
+                is only called when some field is left unresolved
         """
         load_dotenv()
 
@@ -37,6 +64,12 @@ class LifestyleExtractor:
             raise ValueError("DEEPSEEK_API_KEY not found")
 
         self.sleep_time = sleep_time
+        if requests_per_second is None and sleep_time > 0:
+            requests_per_second = 1 / sleep_time
+        self.rate_limiter = RateLimiter(requests_per_second) if requests_per_second else None
+        self.rule_engine = LifestyleRuleEngine() if use_rules else None
+        # Provenance summary of the last process_csv run
+        self.last_run_report: Dict[str, float] = {}
 
         self.llm = ChatOpenAI(
             api_key=self.api_key,
@@ -44,6 +77,7 @@ class LifestyleExtractor:
             model=model_name,
             temperature=temperature,
             max_tokens=max_tokens,
+            cache=get_llm_cache() if use_cache else False,
         )
 
         self.prompt = ChatPromptTemplate.from_messages([
@@ -99,71 +133,151 @@ Règles importantes :
                 pass
         return None
 
+    def _parse_response(self, response: str) -> Dict:
+        result = self._extract_json(response)
+
+        if result:
+            return result
+
+        return {"erreur": "JSON extraction failed", "raw_response": response}
+
     def extract_from_text(self, lifestyle_text: str) -> Dict:
         """Extract lifestyle info from a single text"""
         try:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
             response = self.chain.invoke({"lifestyle_text": lifestyle_text})
-            result = self._extract_json(response)
+            return self._parse_response(response)
 
-            if result:
-                return result
+        except Exception as e:
+            return {"erreur": str(e)}
 
-            return {"erreur": "JSON extraction failed", "raw_response": response}
+    async def aextract_from_text(self, lifestyle_text: str) -> Dict:
+        """Async version of extract_from_text"""
+        try:
+            if self.rate_limiter:
+                await self.rate_limiter.aacquire()
+            response = await self.chain.ainvoke({"lifestyle_text": lifestyle_text})
+            return self._parse_response(response)
 
         except Exception as e:
             return {"erreur": str(e)}
 
+    def _apply_rules(self, lifestyle_text: str) -> Dict[str, str]:
+        return self.rule_engine.extract(lifestyle_text) if self.rule_engine else {}
+
+    @staticmethod
+    def _combine(resolved: Dict[str, str], llm_result: Optional[Dict]) -> Tuple[Dict, Dict[str, str]]:
+        """Rule fields win over the LLM answer, returns the fields and the source of each"""
+        extracted = {**(llm_result or {}), **resolved}
+        provenance = {key: "rules" if key in resolved else "llm" for key in RULE_FIELDS}
+        return extracted, provenance
+
+    def extract_with_provenance(self, lifestyle_text: str) -> Tuple[Dict, Dict[str, str]]:
+        """Extract lifestyle info with the rules first, the LLM only fills unresolved fields"""
+        resolved = self._apply_rules(lifestyle_text)
+        if len(resolved) == len(RULE_FIELDS):
+            return self._combine(resolved, None)
+        return self._combine(resolved, self.extract_from_text(lifestyle_text))
+
+    async def aextract_with_provenance(self, lifestyle_text: str) -> Tuple[Dict, Dict[str, str]]:
+        """Async version of extract_with_provenance"""
+        resolved = self._apply_rules(lifestyle_text)
+        if len(resolved) == len(RULE_FIELDS):
+            return self._combine(resolved, None)
+        return self._combine(resolved, await self.aextract_from_text(lifestyle_text))
+
+    @staticmethod
+    def _to_row(patient_id, extracted: Dict, provenance: Dict[str, str]) -> Dict:
+        """
+        Output row of a patient with the source of each field
+        Fields the LLM should have filled are 'erreur' when its extraction failed
+        """
+        failed = "erreur" in extracted
+        row = {"PatientID": patient_id}
+        for column, key in LIFESTYLE_FIELDS.items():
+            if failed and provenance[key] == "llm":
+                row[column] = "erreur"
+            else:
+                row[column] = extracted.get(key, "inconnu")
+        row["provenance"] = json.dumps({column: provenance[key] for column, key in LIFESTYLE_FIELDS.items()})
+        return row
+
+    def _finish_run(self, rows: List[Dict]) -> pd.DataFrame:
+        """DataFrame of a run, the share of rows and fields resolved without the LLM goes to last_run_report"""
+        provenances = [json.loads(row["provenance"]).values() for row in rows]
+        llm_calls = sum(1 for sources in provenances if "llm" in sources)
+        rule_fields = sum(list(sources).count("rules") for sources in provenances)
+
+        self.last_run_report = {
+            "rows": len(rows),
+            "llm_calls": llm_calls,
+            "llm_calls_avoided": 1 - llm_calls / len(rows) if rows else 0.0,
+            "fields_from_rules": rule_fields / (len(rows) * len(RULE_FIELDS)) if rows else 0.0,
+        }
+        results_df = pd.DataFrame(rows)
+        results_df.attrs["llm_calls_avoided"] = self.last_run_report["llm_calls_avoided"]
+        return results_df
+
+    @staticmethod
+    def _read_lifestyle_csv(input_csv: str) -> pd.DataFrame:
+        df = pd.read_csv(input_csv, encoding="utf-8")
+
+        df = df.dropna(subset=["lifestyle"])
+        return df[df["lifestyle"].str.strip() != ""]
+
     def process_csv(
         self,
         input_csv: str,
         output_csv: Optional[str] = None,
+        max_concurrency: int = 1,
     ) -> pd.DataFrame:
         """
         Process CSV and return DataFrame with extracted lifestyle data
+
+        Args:
+            max_concurrency: LLM calls in flight, above 1 runs aprocess_csv
         """
-        df = pd.read_csv(input_csv, encoding="utf-8")
+        if max_concurrency > 1:
+            return asyncio.run(self.aprocess_csv(input_csv, output_csv, max_concurrency))
 
-        df = df.dropna(subset=["lifestyle"])
-        df = df[df["lifestyle"].str.strip() != ""]
-
-        results = []
-
-        for _, row in df.iterrows():
-            extracted = self.extract_from_text(row["lifestyle"])
-
-            if "erreur" not in extracted:
-                result = {
-                    "PatientID": row["PatientID"],
-                    "tabac_oui_non": extracted.get("tabac_actif", "inconnu"),
-                    "tabac_quantite_PA": extracted.get("tabac_quantite", "inconnu"),
-                    "alcool_oui_non": extracted.get("alcool_actif", "inconnu"),
-                    "alcool_quantite_g_j": extracted.get("alcool_quantite", "inconnu"),
-                    "autres_drogues": extracted.get("autres_drogues", "inconnu"),
-                    "autonomie": extracted.get("autonomie", "inconnu"),
-                    "sport": extracted.get("sport", "inconnu"),
-                    "vit_seul": extracted.get("vit_seul", "inconnu"),
-                    "aide_domicile": extracted.get("aide_domicile", "inconnu"),
-                    "institutionnalise": extracted.get("institutionnalise", "inconnu"),
-                }
-            else:
-                result = {
-                    "PatientID": row["PatientID"],
-                    "tabac_oui_non": "erreur",
-                    "tabac_quantite_PA": "erreur",
-                    "alcool_oui_non": "erreur",
-                    "alcool_quantite_g_j": "erreur",
-                    "autres_drogues": "erreur",
-                    "autonomie": "erreur",
-                    "sport": "erreur",
-                    "vit_seul": "erreur",
-                    "aide_domicile": "erreur",
-                    "institutionnalise": "erreur",
-                }
-
-            results.append(result)
-            time.sleep(self.sleep_time)
-
-        results_df = pd.DataFrame(results)
+        df = self._read_lifestyle_csv(input_csv)
+
+        results = [
+            self._to_row(row["PatientID"], *self.extract_with_provenance(row["lifestyle"]))
+            for _, row in df.iterrows()
+        ]
+
+        results_df = self._finish_run(results)
+
+        # if output_csv:
+        #     results_df.to_csv(output_csv, index=False, encoding="utf-8-sig")
+
+        return results_df
+
+    async def aprocess_csv(
+        self,
+        input_csv: str,
+        output_csv: Optional[str] = None,
+        max_concurrency: int = 8,
+    ) -> pd.DataFrame:
+        """
+        Process CSV with up to max_concurrency concurrent LLM calls, paced by
+        the rate limiter, rows stay in input order
+        """
+        df = self._read_lifestyle_csv(input_csv)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def extract(text: str) -> Tuple[Dict, Dict[str, str]]:
+            async with semaphore:
+                return await self.aextract_with_provenance(text)
+
+        extracted = await asyncio.gather(*(extract(text) for text in df["lifestyle"]))
+
+        results_df = self._finish_run([
+            self._to_row(patient_id, *result)
+            for patient_id, result in zip(df["PatientID"], extracted)
+        ])
 
         # if output_csv:
         #     results_df.to_csv(output_csv, index=False, encoding="utf-8-sig")
@@ -0,0 +1,155 @@
+"""
+Local CIM-10 index resolving common comorbidities without an LLM call
+
+Labels and French abbreviations are normalized (case, accents, punctuation)
+and matched exactly, then by character trigram similarity for spelling
+variants. Confident LLM answers are appended to a separate learned CSV in the
+user's cache directory, the reviewed seed file is never written.
+"""
+
+import csv
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Set
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(__file__), "dictionnaries", "cim10_index.csv")
+# EXTRACTION_CIM10_LEARNED_PATH moves it
+DEFAULT_LEARNED_PATH = os.environ.get(
+    "EXTRACTION_CIM10_LEARNED_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "clinical_extraction", "cim10_learned.csv"),
+)
+INDEX_FIELDS = ["label", "code", "libelle", "source"]
+
+# Abbreviations and short labels are only matched exactly
+MIN_FUZZY_LENGTH = 8
+
+
+def normalize_label(text: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse spaces, "" for non-string values such as NaN cells"""
+    if not isinstance(text, str):
+        return ""
+    text = unicodedata.normalize("NFD", text)
+    text = text.encode("ascii", "ignore").decode("ascii").lower()
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ICD10Index:
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, learned_path: Optional[str] = DEFAULT_LEARNED_PATH,
+                 fuzzy_threshold: float = 0.88):
+        """
+        Args:
+            path: Seed CSV with label, code, libelle and source columns, only read
+            learned_path: CSV receiving the labels added by add(), loaded after the
+                seed; None keeps learned labels in memory
+            fuzzy_threshold: Minimum trigram Dice similarity of a fuzzy match
+        """
+        self.path = path
+        self.learned_path = learned_path
+        self.fuzzy_threshold = fuzzy_threshold
+
+        self._lock = threading.Lock()
+        self._entries: List[Dict[str, str]] = []
+        self._exact: Dict[str, int] = {}
+        self._trigram_postings: Dict[str, List[int]] = defaultdict(list)
+        self._trigram_counts: List[int] = []
+
+        # Seed labels win over learned ones
+        for csv_path in (path, learned_path):
+            if csv_path and os.path.exists(csv_path):
+                with open(csv_path, newline="", encoding="utf-8") as f:
+                    for row in csv.DictReader(f):
+                        self._add_entry(row)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _add_entry(self, row: Dict[str, str]) -> bool:
+        label = normalize_label(row["label"])
+        if not label or label in self._exact:
+            return False
+
+        entry_id = len(self._entries)
+        self._entries.append({**row, "normalized": label})
+        self._exact[label] = entry_id
+
+        trigrams = _trigrams(label)
+        self._trigram_counts.append(len(trigrams))
+        for trigram in trigrams:
+            self._trigram_postings[trigram].append(entry_id)
+        return True
+
+    def lookup(self, text: str) -> Optional[Dict[str, object]]:
+        """
+        Best confident match of a comorbidity, None when the LLM should decide
+        Returns the code, libelle, matched label and match kind ('exact' or 'fuzzy')
+        """
+        query = normalize_label(text)
+        if not query:
+            return None
+
+        with self._lock:
+            entry_id = self._exact.get(query)
+            if entry_id is not None:
+                return self._match(entry_id, "exact", 1.0)
+
+            if len(query) < MIN_FUZZY_LENGTH:
+                return None
+
+            query_trigrams = _trigrams(query)
+            shared: Counter = Counter()
+            for trigram in query_trigrams:
+                shared.update(self._trigram_postings.get(trigram, ()))
+
+            # Labels differing by a number (type 1 / type 2, stade 3 / stade 4) never match,
+            # nor shorter labels missing a qualifier of the query ("... chronique terminale")
+            query_numbers = re.findall(r"\d+", query)
+            query_words = len(query.split())
+            best_id, best_score = None, 0.0
+            for candidate_id, count in shared.items():
+                label = self._entries[candidate_id]["normalized"]
+                if (len(label) < MIN_FUZZY_LENGTH or re.findall(r"\d+", label) != query_numbers
+                        or len(label.split()) < query_words):
+                    continue
+                score = 2 * count / (len(query_trigrams) + self._trigram_counts[candidate_id])
+                if score > best_score:
+                    best_id, best_score = candidate_id, score
+
+            if best_id is not None and best_score >= self.fuzzy_threshold:
+                return self._match(best_id, "fuzzy", best_score)
+        return None
+
+    def _match(self, entry_id: int, kind: str, score: float) -> Dict[str, object]:
+        entry = self._entries[entry_id]
+        return {
+            "code": entry["code"],
+            "libelle": entry["libelle"],
+            "label": entry["label"],
+            "match": kind,
+            "score": round(score, 3),
+        }
+
+    def add(self, label: str, code: str, libelle: str, source: str = "llm") -> bool:
+        """Add a label to the index and append it to the learned CSV, False if the label is already known"""
+        row = {"label": label.strip(), "code": code.strip(), "libelle": libelle.strip(), "source": source}
+        with self._lock:
+            if not self._add_entry(row):
+                return False
+            if not self.learned_path:
+                return True
+
+            os.makedirs(os.path.dirname(os.path.abspath(self.learned_path)), exist_ok=True)
+            write_header = not os.path.exists(self.learned_path)
+            with open(self.learned_path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=INDEX_FIELDS)
+                if write_header:
+                    writer.writeheader()
+                writer.writerow(row)
+        return True
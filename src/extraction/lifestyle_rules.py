@@ -0,0 +1,220 @@
+"""
+Deterministic fast path for the lifestyle fields of LifestyleExtractor
+
+Precompiled patterns resolve the formulaic cases spelled out in the LLM prompt
+("10PA", "OH", "2 verres de vin par jour", "autonome à domicile", "grabataire")
+with the same unit conversions. A field is only returned when the rules are
+unambiguous, a topic that the text never mentions is "inconnu" as in the prompt.
+"""
+
+import re
+import unicodedata
+from typing import Dict, Optional, Pattern, Tuple
+
+# Keys of the LLM JSON answer
+RULE_FIELDS = (
+    "tabac_actif",
+    "tabac_quantite",
+    "alcool_actif",
+    "alcool_quantite",
+    "autres_drogues",
+    "autonomie",
+    "sport",
+    "vit_seul",
+    "aide_domicile",
+    "institutionnalise",
+)
+
+# Same conversions as the prompt
+CIGARETTES_PER_PACK = 20
+GRAMS_PER_DRINK = {"verre": 10, "bouteille de vin": 80, "alcool fort": 220}
+
+# Second term of a range or fraction ("3-4 cg/j", "1/2 paquet") is not a quantity, these are left to the LLM
+_NUMBER = r"(?<!\d[/-])(?<!\d [/-])(?<!\d[/-] )(?<!\d [/-] )\b(\d+(?:[.,]\d+)?|un|une|deux|trois|quatre|cinq|six)"
+_NUMBER_WORDS = {"un": 1, "une": 1, "deux": 2, "trois": 3, "quatre": 4, "cinq": 5, "six": 6}
+
+
+# Alcoholic drinks, a glass or a bottle only counts with one of them ("2 verres d'eau" does not)
+_DRINK = (r"(?:vins?|rouge|blanc|bieres?|whisky|pastis|vodka|rhum|gin|alcool(?: fort)?|aperitifs?|champagne"
+          r"|cidre|digestifs?|liqueurs?)\b")
+# Non-alcoholic drinks in the same clause as "boit"
+_SOFT_DRINK = r"(?:eau|lait|jus|the|cafe|tisane|soda)\b"
+
+
+def _c(pattern: str) -> Pattern:
+    return re.compile(pattern)
+
+
+# field: (topic mentioned, negative statement, positive statement), on normalized text
+_BINARY_RULES: Dict[str, Tuple[Pattern, Pattern, Pattern]] = {
+    "tabac_actif": (
+        _c(r"tabac|tabagi|fume|fumeu|cigar|paquet|\bcg\b|\d\s*pa\b"),
+        _c(r"non[- ]?fumeu\w*|jamais fume|ne fume (?:pas|plus)|pas de tabac\w*|absence de tabac\w*|tabac\w*\s*:?\s*(?:non|0|neg)\b"
+           r"|tabagisme (?:sevre|ancien|arrete|stoppe)|(?:ex|ancien)[- ]?fumeu\w*|sevrage tabagique"),
+        _c(r"tabagisme actif|tabagisme\s*:?\s*oui|\bfumeu(?:r|se)\b|\bfume\b|tabagique actif"),
+    ),
+    "alcool_actif": (
+        _c(r"alcool|\boh\b|ethyl|\bvins?\b|bieres?|whisky|pastis|aperitif|verres?|bouteilles?|canettes?|\bg/j\b"
+           r"|\bboit\b|buveu|abstinen"),
+        _c(r"pas d'?(?:alcool|oh)\b|absence d'?(?:alcool|oh)\b|(?:alcool|oh)\s*:?\s*(?:non|0|neg)\b|abstinen\w*"
+           r"|ne boit pas|non buveu\w*|(?:ethylisme|alcoolisme|oh) (?:sevre|ancien|arrete)|sevrage (?:alcoolique|ethylique)"),
+        _c(rf"\d\s*(?:verres?|bouteilles?|canettes?) (?:de |d')?{_DRINK}|\d\s*g(?:rammes?)? d'alcool"
+           r"|(?:\balcool|\boh)\s*:?\s*\d+(?:[.,]\d+)?\s*g\b"
+           r"|(?:consommation|intoxication) (?:d'?alcool|oh|ethylique|alcoolique)"
+           r"|(?:ethylisme|alcoolisme) (?:actif|chronique)|\boh (?:occasionnel|chronique|festif|modere)|alcool (?:occasionnel|modere)"
+           rf"|\bboit\b(?![^.;,]*\b{_SOFT_DRINK})|\boh\s*\+"),
+    ),
+    "autres_drogues": (
+        _c(r"drogue|cannabis|hero[iï]n|cocaine|toxicomanie|toxique|stupefiant|methadone|subutex|\bthc\b|crack|mdma|ecstasy|opiac"),
+        _c(r"pas de (?:drogues?|toxiques?|toxicomanie|stupefiants?|cannabis)|absence de (?:drogues?|toxicomanie|toxiques?)"
+           r"|(?:drogues?|toxiques?)\s*:?\s*(?:non|0|neg)\b|aucune (?:drogue|toxicomanie)"),
+        _c(r"cannabis|hero[iï]n|cocaine|toxicomanie (?:active|actuelle)|methadone|subutex|crack|mdma|ecstasy"),
+    ),
+    "sport": (
+        _c(r"sport|activite physique|sedentaire|velo|natation|course a pied|footing|jogging|randonn|tennis|football|fitness|\bgym"),
+        _c(r"sedentaire|pas de (?:sport|activite physique)|aucune activite physique|sport\s*:?\s*(?:non|0)\b|ne fait pas de sport"),
+        _c(r"\bsport|activite physique|velo|natation|course a pied|footing|jogging|randonn|tennis|football|fitness|\bgym"),
+    ),
+    "vit_seul": (
+        _c(r"\bvit\b|vivant|\bseule?\b|en couple|epou\w*|conjoint|compagn\w*|\bmarie|celibataire|veu(?:f|ve)|isole"),
+        _c(r"(?:vit|vivant) avec|en couple|\bmariee?\b|avec (?:sa|son|ses) (?:femme|epouse|mari|conjoint\w*|compagn\w*|fille|fils|famille|enfants?)"),
+        _c(r"(?:vit|vivant|habite) seule?|seule? a domicile|isolee? socialement"),
+    ),
+    "aide_domicile": (
+        _c(r"\baides?\b|auxiliaire|\bide\b|infirmi|portage|ssiad|passage"),
+        _c(r"sans aide|pas d'?aide|aucune aide|aides?\s*:?\s*(?:non|0)\b"),
+        _c(r"aides? (?:a|au) domicile|aides?[- ]menag\w*|auxiliaire de vie|passage (?:d'?une |de l'?|des )?(?:ide|infirmi\w*|aides?)"
+           r"|ssiad|portage de repas|(?:ide|infirmi\w*) a domicile|aides? humaines?"),
+    ),
+    "institutionnalise": (
+        _c(r"ehpad|institution|maison de retraite|foyer|usld|domicile|long sejour|residence"),
+        _c(r"\ba domicile|au domicile|chez (?:lui|elle|soi)"),
+        _c(r"ehpad|institutionnalise\w*|en institution|maison de retraite|usld|foyer logement|residence (?:senior|autonomie)|long sejour"),
+    ),
+}
+
+_AUTONOMY_TOPIC = _c(r"autonom|grabataire|alite|dependan|deambul|canne|fauteuil|\bgir\b")
+# Checked in order, a text matching two levels is left to the LLM
+_AUTONOMY_LEVELS = (
+    ("grabataire", _c(r"grabataire|alitee?\b|confinee? au lit")),
+    ("limité", _c(r"peu autonome|partiellement autonome|semi[- ]?autonome|autonomie (?:limitee|reduite|partielle)"
+                  r"|perte d'autonomie|deambulateur|\bcanne\b|fauteuil roulant")),
+    ("autonome", _c(r"(?<!peu )(?<!non )(?<!partiellement )(?<!semi )(?<!semi-)\bautonome\b")),
+)
+
+_PACK_YEARS = _c(rf"{_NUMBER}\s*(?:pa|p/a|paquets?[- ]?annees?|paquets?/an(?:nee)?s?)\b")
+_PER_DAY = r"\s*(?:/\s*j(?:our)?\b|par jour|quotidien\w*)"
+_CIGARETTES_PER_DAY = _c(rf"{_NUMBER}\s*(?:cg|cig\w*){_PER_DAY}")
+_PACKS_PER_DAY = _c(rf"{_NUMBER}\s*paquets?{_PER_DAY}")
+_YEARS = _c(r"(?:depuis|pendant|durant) (\d+) ans")
+
+_DRINKS = (
+    ("bouteille de vin", _c(rf"{_NUMBER}\s*bouteilles? de vin{_PER_DAY}")),
+    ("alcool fort", _c(rf"{_NUMBER}\s*bouteilles? (?:de |d')?(?:whisky|alcool fort|vodka|rhum|pastis|gin){_PER_DAY}")),
+    ("verre", _c(rf"{_NUMBER}\s*verres?(?: (?:de |d'){_DRINK})?{_PER_DAY}")),
+)
+_GRAMS_PER_DAY = _c(rf"{_NUMBER}\s*g(?:rammes?)?\s*(?:d'alcool\s*)?(?:/\s*j(?:our)?\b|par jour)")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase without accents, typographic apostrophes and whitespace runs"""
+    text = unicodedata.normalize("NFD", text)
+    text = text.encode("ascii", "ignore").decode("ascii").lower()
+    return re.sub(r"\s+", " ", text.replace("’", "'"))
+
+
+def _number(token: str) -> float:
+    return _NUMBER_WORDS.get(token) or float(token.replace(",", "."))
+
+
+def _format(value: float) -> str:
+    return f"{value:g}"
+
+
+def _single(pattern: Pattern, text: str) -> Optional[float]:
+    """Value of the only match of a quantity pattern, None when absent or repeated"""
+    matches = pattern.findall(text)
+    return _number(matches[0]) if len(matches) == 1 else None
+
+
+class LifestyleRuleEngine:
+    """Resolves the lifestyle fields that formulaic text states without ambiguity"""
+
+    def extract(self, lifestyle_text: str) -> Dict[str, str]:
+        """Fields resolved by the rules, keyed like the LLM answer; unresolved fields are absent"""
+        text = normalize_text(lifestyle_text)
+        resolved: Dict[str, str] = {}
+
+        for field, (topic, negative, positive) in _BINARY_RULES.items():
+            value = self._binary(text, topic, negative, positive)
+            if value is not None:
+                resolved[field] = value
+
+        for field, value in (
+            ("tabac_quantite", self._tobacco_quantity(text)),
+            ("alcool_quantite", self._alcohol_quantity(text)),
+            ("autonomie", self._autonomy(text)),
+        ):
+            if value is not None:
+                resolved[field] = value
+
+        return resolved
+
+    @staticmethod
+    def _binary(text: str, topic: Pattern, negative: Pattern, positive: Pattern) -> Optional[str]:
+        if not topic.search(text):
+            return "inconnu"
+        negated = negative.search(text) is not None
+        # Negative statements are removed first, "pas de cannabis" does not affirm cannabis
+        affirmed = positive.search(negative.sub(" ", text)) is not None
+        if negated == affirmed:
+            return None
+        return "non" if negated else "oui"
+
+    @staticmethod
+    def _tobacco_quantity(text: str) -> Optional[str]:
+        if not _BINARY_RULES["tabac_actif"][0].search(text):
+            return "inconnu"
+
+        pack_years = _single(_PACK_YEARS, text)
+        if pack_years is not None:
+            return f"{_format(pack_years)} paquets/année"
+
+        # Daily consumption converts to pack-years only with a duration
+        years = _single(_YEARS, text)
+        cigarettes = _single(_CIGARETTES_PER_DAY, text)
+        packs = _single(_PACKS_PER_DAY, text)
+        if years is None or (cigarettes is None) == (packs is None):
+            return None
+        packs_per_day = packs if packs is not None else cigarettes / CIGARETTES_PER_PACK  # type: ignore
+        return f"{_format(round(packs_per_day * years, 1))} paquets/année"
+
+    @staticmethod
+    def _alcohol_quantity(text: str) -> Optional[str]:
+        topic, negative, _ = _BINARY_RULES["alcool_actif"]
+        if not topic.search(text):
+            return "inconnu"
+        # A stopped or denied consumption next to a quantity is left to the LLM
+        if negative.search(text):
+            return None
+
+        quantities = [(kind, pattern.findall(text)) for kind, pattern in _DRINKS]
+        grams = _GRAMS_PER_DAY.findall(text)
+        mentions = sum(len(found) for _, found in quantities) + len(grams)
+        # Several drinks (or a drink and a total) are left to the LLM
+        if mentions != 1:
+            return None
+
+        if grams:
+            return f"{_format(_number(grams[0]))} grammes/jour"
+        for kind, found in quantities:
+            if found:
+                return f"{_format(_number(found[0]) * GRAMS_PER_DRINK[kind])} grammes/jour"
+        return None
+
+    @staticmethod
+    def _autonomy(text: str) -> Optional[str]:
+        if not _AUTONOMY_TOPIC.search(text):
+            return "inconnu"
+        levels = [level for level, pattern in _AUTONOMY_LEVELS if pattern.search(text)]
+        return levels[0] if len(levels) == 1 else None
@@ -0,0 +1,158 @@
+"""
+Disk-backed LangChain LLM cache shared by the extraction chains
+
+Entries are keyed by a hash of the rendered prompt and the LLM string, which
+LangChain builds from the model name, temperature, max_tokens and the other
+call parameters, so changing any of them misses the cache.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+
+class SQLiteLLMCache(BaseCache):
+    def __init__(
+        self,
+        db_path: str,
+        ttl_seconds: Optional[float] = 7 * 24 * 3600,
+        max_entries: int = 50000,
+        bypass: bool = False,
+    ):
+        """
+        Args:
+            db_path: SQLite file, created if needed
+            ttl_seconds: Age after which an entry is ignored and deleted, None keeps entries forever
+            max_entries: Least recently used entries beyond this are deleted
+            bypass: Always miss so every call reaches the API, answers are still stored
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.bypass = bypass
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT, latency REAL, created REAL, last_used REAL)"
+        )
+        # Least recently used entries are found through the index instead of a sort
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_used ON llm_cache (last_used)")
+        self._conn.commit()
+        # Entry count kept up to date by this process, the LRU trim only runs above max_entries
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+        # Start time of each missed call, its latency is stored with the answer
+        self._pending: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        key = self._key(prompt, llm_string)
+        now = time.time()
+
+        with self._lock:
+            row = None
+            if not self.bypass:
+                row = self._conn.execute(
+                    "SELECT value, latency, created FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+
+            if row is not None and self.ttl_seconds is not None and now - row[2] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self._entries -= 1
+                row = None
+
+            if row is None:
+                self.misses += 1
+                self._pending[key] = time.perf_counter()
+                return None
+
+            self._conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            self.saved_seconds += row[1]
+
+        return [loads(generation) for generation in json.loads(row[0])]
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        value = json.dumps([dumps(generation) for generation in return_val])
+
+        with self._lock:
+            started = self._pending.pop(key, None)
+            latency = time.perf_counter() - started if started is not None else 0.0
+            exists = self._conn.execute("SELECT 1 FROM llm_cache WHERE key = ?", (key,)).fetchone() is not None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, latency, created, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, value, latency, now, now),
+            )
+            if not exists:
+                self._entries += 1
+            if self._entries > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_used LIMIT ?)",
+                    (self._entries - self.max_entries,),
+                )
+                # Recount, other processes may write to the same database
+                self._entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            self._conn.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            self._entries = 0
+            self._pending.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hits, misses and API time saved since this process started"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "enabled": not self.bypass,
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_seconds": round(self.saved_seconds, 1),
+        }
+
+
+_default_cache: Optional[SQLiteLLMCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> SQLiteLLMCache:
+    """
+    Process-wide cache of the extraction chains
+    EXTRACTION_LLM_CACHE_DB moves the database, EXTRACTION_LLM_CACHE_BYPASS=1 forces fresh calls
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            db_path = os.environ.get(
+                "EXTRACTION_LLM_CACHE_DB",
+                os.path.join(os.path.expanduser("~"), ".cache", "clinical_extraction", "llm_cache.sqlite"),
+            )
+            bypass = os.environ.get("EXTRACTION_LLM_CACHE_BYPASS", "0") == "1"
+            _default_cache = SQLiteLLMCache(db_path, bypass=bypass)
+        return _default_cache
@@ -8,6 +8,8 @@ from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
+from src.extraction.llm_cache import get_llm_cache
+
 load_dotenv()  # loads .env automatically
 
 # ---------------------------------------------------------
@@ -39,11 +41,13 @@ parser = StrOutputParser()
 # Configure DeepSeek model
 # ---------------------------------------------------------
 def get_llm(stream=False):
+    # Streamed tokens are not cached, complete answers come from the shared cache
     return ChatOpenAI(
         model="deepseek-chat",
         base_url="https://api.deepseek.com/v1",
         temperature=0.7,
         streaming=stream,
+        cache=False if stream else get_llm_cache(),
     )
 
 
@@ -0,0 +1,50 @@
+"""
+Token-bucket rate limiter pacing LLM API calls
+from threads (acquire) and coroutines (aacquire)
+"""
+
+import asyncio
+import threading
+import time
+from typing import Callable
+
+
+class RateLimiter:
+    def __init__(self, requests_per_second: float, burst: int = 1, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            requests_per_second: Sustained call rate
+            burst: Calls allowed back to back after an idle period
+            clock: Monotonic time source in seconds
+        """
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be positive")
+
+        self.rate = requests_per_second
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token, possibly borrowed from the future, and return how long to wait for it"""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            # Callers borrowing tokens queue up in reservation order
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self) -> None:
+        """Block until the next call is allowed"""
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def aacquire(self) -> None:
+        """Wait on the event loop until the next call is allowed"""
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
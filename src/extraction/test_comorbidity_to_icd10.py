@@ -0,0 +1,137 @@
+import json
+
+from src.extraction.comorbidity_to_icd10 import ComorbidityICD10Converter
+from src.extraction.icd10_index import ICD10Index
+
+CODES = {"Diabète de type 2": "E11.9", "Hypertension artérielle": "I10", "Asthme": "J45.9"}
+
+
+def item(index, text):
+    return {"index": index, "codes_cim10": [{"code": CODES[text], "libelle": text, "confiance": "haute"}]}
+
+
+class ScriptedChain:
+    """LLM chain stand-in returning the scripted answers in turn and recording its inputs"""
+
+    def __init__(self, answers=()):
+        self.answers = list(answers)
+        self.inputs = []
+
+    def invoke(self, inputs):
+        self.inputs.append(inputs)
+        return self.answers.pop(0)
+
+
+class SingleChain(ScriptedChain):
+    def invoke(self, inputs):
+        self.inputs.append(inputs)
+        text = inputs["comorbidity"]
+        return json.dumps({"comorbidite_originale": text,
+                           "codes_cim10": [{"code": CODES[text], "libelle": text, "confiance": "moyenne"}]})
+
+
+def make_converter(batch_answers, max_batch_retries=0):
+    converter = ComorbidityICD10Converter(api_key="test-key", use_cache=False, use_index=False,
+                                          max_batch_retries=max_batch_retries)
+    converter.batch_chain = ScriptedChain(batch_answers)
+    converter.chain = SingleChain()
+    return converter
+
+
+def codes(results):
+    return [result["codes_cim10"][0]["code"] for result in results]
+
+
+def test_reordered_items_are_matched_by_index():
+    texts = list(CODES)
+    converter = make_converter([json.dumps([item(3, texts[2]), item(1, texts[0]), item(2, texts[1])])])
+
+    results = converter.convert_batch_to_icd10(texts)
+
+    assert codes(results) == ["E11.9", "I10", "J45.9"]
+    assert [r["comorbidite_originale"] for r in results] == texts
+    assert converter.chain.inputs == []
+    assert converter.llm_requests == 1
+
+
+def test_missing_items_fall_back_to_single_requests():
+    texts = list(CODES)
+    converter = make_converter([json.dumps([item(1, texts[0])])])
+
+    results = converter.convert_batch_to_icd10(texts)
+
+    assert codes(results) == ["E11.9", "I10", "J45.9"]
+    assert [inputs["comorbidity"] for inputs in converter.chain.inputs] == texts[1:]
+
+
+def test_missing_items_are_retried_in_a_smaller_batch():
+    texts = list(CODES)
+    converter = make_converter([json.dumps([item(2, texts[1])]),
+                                json.dumps([item(1, texts[0]), item(2, texts[2])])], max_batch_retries=1)
+
+    results = converter.convert_batch_to_icd10(texts)
+
+    assert codes(results) == ["E11.9", "I10", "J45.9"]
+    assert converter.batch_chain.inputs[1]["comorbidities"] == "1. Diabète de type 2\n2. Asthme"
+    assert converter.chain.inputs == []
+
+
+def test_extra_and_invalid_items_are_ignored():
+    texts = list(CODES)[:2]
+    answer = [
+        item(1, texts[0]),
+        {"index": 2, "codes_cim10": "I10"},
+        {"index": "deux", "codes_cim10": []},
+        item(3, "Asthme"),
+    ]
+    converter = make_converter([json.dumps(answer)])
+
+    results = converter.convert_batch_to_icd10(texts)
+
+    assert codes(results) == ["E11.9", "I10"]
+    assert [inputs["comorbidity"] for inputs in converter.chain.inputs] == [texts[1]]
+
+
+def test_malformed_json_falls_back_to_single_requests():
+    texts = list(CODES)[:2]
+    converter = make_converter(['Voici les codes : [{"index": 1, "codes_cim10": [', "Je ne peux pas répondre."],
+                               max_batch_retries=1)
+
+    results = converter.convert_batch_to_icd10(texts)
+
+    assert codes(results) == ["E11.9", "I10"]
+    assert len(converter.batch_chain.inputs) == 2
+    assert [inputs["comorbidity"] for inputs in converter.chain.inputs] == texts
+    assert converter.llm_requests == 4
+
+
+def test_index_hits_skip_the_llm_and_misses_are_learned(tmp_path):
+    converter = ComorbidityICD10Converter(api_key="test-key", use_cache=False,
+                                          index=ICD10Index(learned_path=str(tmp_path / "learned.csv")))
+    converter.chain = ScriptedChain([json.dumps({"codes_cim10": [
+        {"code": "J45.0", "libelle": "Asthme à prédominance allergique", "confiance": "haute"}]})])
+
+    exact = converter.convert_to_icd10("Hypertension artérielle")
+    fuzzy = converter.convert_to_icd10("Insufisance rénale chronique")
+    assert (exact["source"], exact["codes_cim10"][0]["confiance"]) == ("index", "haute")
+    assert (fuzzy["source"], fuzzy["codes_cim10"][0]["confiance"]) == ("index", "moyenne")
+    assert converter.chain.inputs == []
+
+    # Misses go to the LLM, its high-confidence answer is learned
+    assert converter.convert_to_icd10("Asthme allergique")["codes_cim10"][0]["code"] == "J45.0"
+    assert converter.index.lookup("asthme allergique")["code"] == "J45.0"
+    assert (converter.llm_requests, converter.index_hits) == (1, 2)
+
+
+def test_nan_rows_go_to_the_llm_and_are_not_learned(tmp_path):
+    converter = ComorbidityICD10Converter(api_key="test-key", use_cache=False,
+                                          index=ICD10Index(learned_path=str(tmp_path / "learned.csv")))
+    converter.chain = ScriptedChain([json.dumps({"codes_cim10": [
+        {"code": "R69", "libelle": "Cause inconnue", "confiance": "haute"}]})])
+    size = len(converter.index)
+
+    result = converter.convert_to_icd10(float("nan"))
+    assert result["codes_cim10"][0]["code"] == "R69"
+    assert (converter.llm_requests, converter.index_hits) == (1, 0)
+    assert len(converter.index) == size
+    assert not (tmp_path / "learned.csv").exists()
@@ -0,0 +1,55 @@
+import asyncio
+import json
+
+from src.extraction.extract_lifestyle import LIFESTYLE_FIELDS, LifestyleExtractor
+
+
+class SlowChain:
+    """LLM chain stand-in, earlier rows answer last so completions arrive out of order"""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def ainvoke(self, inputs):
+        text = inputs["lifestyle_text"]
+        self.calls.append(text)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delays[text])
+        self.in_flight -= 1
+        return json.dumps({"tabac_actif": "oui", "tabac_quantite": f"{len(text)} paquets/année"})
+
+
+def test_concurrent_rows_keep_order_and_provenance(tmp_path):
+    texts = {
+        "P1": "Fumeur depuis l'adolescence",
+        "P2": "Grabataire",
+        "P3": "Fumeuse avec tabagisme actif",
+        "P4": "Fume la pipe",
+    }
+    input_csv = tmp_path / "lifestyle.csv"
+    input_csv.write_text("PatientID,lifestyle\n" + "".join(f"{pid},{text}\n" for pid, text in texts.items()),
+                         encoding="utf-8")
+
+    extractor = LifestyleExtractor(api_key="test-key", sleep_time=0, use_cache=False)
+    extractor.chain = SlowChain({text: 0.05 * (4 - i) for i, text in enumerate(texts.values())})
+
+    df = extractor.process_csv(str(input_csv), max_concurrency=2)
+
+    assert list(df["PatientID"]) == list(texts)
+    assert extractor.chain.peak <= 2
+    # "Grabataire" resolves every field, the LLM never sees it
+    assert texts["P2"] not in extractor.chain.calls
+    assert set(json.loads(df["provenance"][1]).values()) == {"rules"}
+    assert df["autonomie"][1] == "grabataire"
+
+    for row_index, pid in ((0, "P1"), (2, "P3"), (3, "P4")):
+        provenance = json.loads(df["provenance"][row_index])
+        assert provenance["tabac_oui_non"] == "rules"
+        assert provenance["tabac_quantite_PA"] == "llm"
+        assert df["tabac_quantite_PA"][row_index] == f"{len(texts[pid])} paquets/année"
+    assert df.attrs["llm_calls_avoided"] == 0.25
+    assert set(LIFESTYLE_FIELDS) < set(df.columns)
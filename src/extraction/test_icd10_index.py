@@ -0,0 +1,43 @@
+from src.extraction.icd10_index import DEFAULT_INDEX_PATH, ICD10Index
+
+
+def test_exact_matches_ignore_case_accents_and_punctuation(tmp_path):
+    index = ICD10Index(learned_path=str(tmp_path / "learned.csv"))
+
+    match = index.lookup("  Insuffisance Renale Chronique. ")
+    assert (match["code"], match["match"]) == ("N18.9", "exact")
+    assert index.lookup("hta")["code"] == "I10"
+
+
+def test_missing_values_are_misses(tmp_path):
+    index = ICD10Index(learned_path=str(tmp_path / "learned.csv"))
+
+    assert index.lookup(float("nan")) is None
+    assert index.lookup(None) is None
+    assert index.lookup(" - ") is None
+
+
+def test_fuzzy_matches_spelling_variants_only(tmp_path):
+    index = ICD10Index(learned_path=str(tmp_path / "learned.csv"))
+
+    match = index.lookup("insufisance rénale chronique")
+    assert (match["code"], match["match"]) == ("N18.9", "fuzzy")
+    # A qualifier missing from the label changes the code (N18.5), the LLM decides
+    assert index.lookup("insuffisance rénale chronique terminale") is None
+    assert index.lookup("diabète de type 3") is None
+
+
+def test_learned_labels_go_to_their_own_file(tmp_path):
+    learned_path = tmp_path / "cache" / "learned.csv"
+    with open(DEFAULT_INDEX_PATH, encoding="utf-8") as f:
+        seed = f.read()
+
+    index = ICD10Index(learned_path=str(learned_path))
+    assert index.add("syndrome d'apnées du sommeil", "G47.3", "Apnée du sommeil")
+    assert not index.add("HTA", "I15.9", "Hypertension secondaire")
+
+    with open(DEFAULT_INDEX_PATH, encoding="utf-8") as f:
+        assert f.read() == seed
+    reloaded = ICD10Index(learned_path=str(learned_path))
+    assert reloaded.lookup("Syndrome d'apnées du sommeil")["code"] == "G47.3"
+    assert len(reloaded) == len(index)
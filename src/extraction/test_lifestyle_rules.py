@@ -0,0 +1,61 @@
+import pytest
+
+from src.extraction.lifestyle_rules import RULE_FIELDS, LifestyleRuleEngine
+
+# (text, field, value), None when the field is left to the LLM
+CASES = [
+    ("Tabagisme actif à 10PA", "tabac_actif", "oui"),
+    ("Non fumeur", "tabac_actif", "non"),
+    ("Ancien fumeur, fume encore parfois", "tabac_actif", None),
+    ("Tabagisme actif à 10PA", "tabac_quantite", "10 paquets/année"),
+    ("Fume 10 cigarettes par jour depuis 20 ans", "tabac_quantite", "10 paquets/année"),
+    ("Fumeur depuis l'adolescence", "tabac_quantite", None),
+    ("3/4 cg/j depuis 20 ans", "tabac_quantite", None),
+    ("Fume 10-15 cigarettes par jour depuis 20 ans", "tabac_quantite", None),
+    ("Consommation OH occasionnelle", "alcool_actif", "oui"),
+    ("2 verres de vin par jour", "alcool_actif", "oui"),
+    ("Pas d'alcool", "alcool_actif", "non"),
+    ("Mange 2 verres d'eau par jour", "alcool_actif", None),
+    ("Boit beaucoup de jus de fruits", "alcool_actif", None),
+    ("Il boit beaucoup.", "alcool_actif", "oui"),
+    ("Ne boit pas.", "alcool_actif", "non"),
+    ("Non buveur.", "alcool_actif", "non"),
+    ("Abstinent depuis 5 ans", "alcool_actif", "non"),
+    ("2 verres de vin par jour", "alcool_quantite", "20 grammes/jour"),
+    ("1 bouteille de vin par jour", "alcool_quantite", "80 grammes/jour"),
+    ("Pas d'alcool", "alcool_quantite", None),
+    ("Mange 2 verres d'eau par jour", "alcool_quantite", None),
+    ("2 verres de vin et 1 bière par jour", "alcool_quantite", None),
+    ("2-3 verres de vin par jour", "alcool_quantite", None),
+    ("Consommation de cannabis", "autres_drogues", "oui"),
+    ("Héroïnomane", "autres_drogues", "oui"),
+    ("Pas de drogues", "autres_drogues", "non"),
+    ("Ancienne toxicomanie", "autres_drogues", None),
+    ("Autonome à domicile", "autonomie", "autonome"),
+    ("Peu autonome, marche avec une canne", "autonomie", "limité"),
+    ("Grabataire", "autonomie", "grabataire"),
+    ("Autonome mais grabataire depuis sa chute", "autonomie", None),
+    ("Pratique la natation", "sport", "oui"),
+    ("Sédentaire", "sport", "non"),
+    ("Sédentaire, fait du vélo le week-end", "sport", None),
+    ("Vit seul", "vit_seul", "oui"),
+    ("Vit avec son épouse", "vit_seul", "non"),
+    ("Veuf", "vit_seul", None),
+    ("Passage d'une IDE à domicile", "aide_domicile", "oui"),
+    ("Sans aide", "aide_domicile", "non"),
+    ("Aide de sa fille", "aide_domicile", None),
+    ("Vit en EHPAD", "institutionnalise", "oui"),
+    ("Vit au domicile", "institutionnalise", "non"),
+    ("Retour à domicile envisagé depuis l'EHPAD", "institutionnalise", None),
+]
+
+
+@pytest.mark.parametrize("text, field, expected", CASES)
+def test_field_resolution(text, field, expected):
+    assert LifestyleRuleEngine().extract(text).get(field) == expected
+
+
+def test_unmentioned_topics_are_unknown():
+    resolved = LifestyleRuleEngine().extract("Patient sans particularité")
+
+    assert resolved == {field: "inconnu" for field in RULE_FIELDS}
@@ -0,0 +1,66 @@
+from langchain_core.outputs import Generation
+
+from src.extraction import llm_cache
+from src.extraction.llm_cache import SQLiteLLMCache
+
+LLM = "deepseek-chat temperature=0.1"
+
+
+def answer(text):
+    return [Generation(text=text)]
+
+
+def test_hit_and_miss(tmp_path):
+    cache = SQLiteLLMCache(str(tmp_path / "cache.sqlite"))
+
+    assert cache.lookup("prompt", LLM) is None
+    cache.update("prompt", LLM, answer('{"tabac_actif": "oui"}'))
+
+    assert cache.lookup("prompt", LLM) == answer('{"tabac_actif": "oui"}')
+    assert cache.lookup("prompt", "deepseek-chat temperature=0.3") is None
+    # A new process reads the same database
+    assert SQLiteLLMCache(str(tmp_path / "cache.sqlite")).lookup("prompt", LLM) == answer('{"tabac_actif": "oui"}')
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 2)
+
+
+def test_expired_entries_miss_and_are_deleted(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    cache = SQLiteLLMCache(str(tmp_path / "cache.sqlite"), ttl_seconds=60)
+    cache.update("prompt", LLM, answer("a"))
+
+    now[0] += 30
+    assert cache.lookup("prompt", LLM) == answer("a")
+    now[0] += 60
+    assert cache.lookup("prompt", LLM) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_bypass_always_misses_but_stores(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    SQLiteLLMCache(path).update("prompt", LLM, answer("old"))
+    cache = SQLiteLLMCache(path, bypass=True)
+
+    assert cache.lookup("prompt", LLM) is None
+    cache.update("prompt", LLM, answer("new"))
+
+    assert SQLiteLLMCache(path).lookup("prompt", LLM) == answer("new")
+    assert cache.stats()["enabled"] is False
+
+
+def test_least_recently_used_entries_are_trimmed(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    cache = SQLiteLLMCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    for prompt in ("a", "b"):
+        now[0] += 1
+        cache.update(prompt, LLM, answer(prompt))
+
+    now[0] += 1
+    cache.lookup("a", LLM)
+    now[0] += 1
+    cache.update("c", LLM, answer("c"))
+
+    assert cache.lookup("b", LLM) is None
+    assert cache.lookup("a", LLM) == answer("a")
+    assert cache.stats()["entries"] == 2
@@ -0,0 +1,35 @@
+import pytest
+
+from src.extraction.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_burst_then_sustained_rate():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_second=10, burst=2, clock=clock)
+
+    # Two calls go through at once, the next ones queue 0.1 s apart
+    delays = [limiter._reserve() for _ in range(4)]
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2] == pytest.approx(0.1)
+    assert delays[3] == pytest.approx(0.2)
+
+
+def test_idle_time_refills_up_to_the_burst():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_second=2, burst=3, clock=clock)
+    for _ in range(3):
+        limiter._reserve()
+
+    clock.now += 60
+    delays = [limiter._reserve() for _ in range(4)]
+
+    assert delays[:3] == [0.0, 0.0, 0.0]
+    assert delays[3] == pytest.approx(0.5)